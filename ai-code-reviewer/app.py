@@ -2,24 +2,46 @@
 
 import streamlit as st
 
+import os
+
 from pathlib import Path
 
 import json
 
-import io
-
 import base64
 
-import pandas as pd
+import threading
+
+import time
+
+import queue
+
+import uuid
+
+from concurrent.futures import ThreadPoolExecutor
+
+# pandas, altair and the analysis modules are imported where they are used, so
+
+# a cold server can serve the first page before they are loaded
+
+
+from core.utils import read_file
+
+from core.cache import default_cache, source_hash
+
+from core.report_store import default_store
 
-import matplotlib.pyplot as plt
+from core.instrument import stage
 
+from core.profiling import profile_run, profiling_enabled
 
-from core.utils import read_file, write_file, save_json
+from core.metrics import start_exporters_from_env
 
-from core.code_analysis import analyze_file
+from core.pool import PoolBusy, shared_pool
 
-from core.formatter import get_formatted_copy, run_black
+from core.issue_index import SORT_KEYS, IssueIndex
+
+from core.complexity_summary import summarize as summarize_complexity
 
 
 # --- Settings ---
@@ -39,102 +61,683 @@ OUTPUTS = ROOT / "outputs"
 
 REPORTS = ROOT / "reports"
 
-for d in (INPUTS, OUTPUTS, REPORTS):
-
-    d.mkdir(exist_ok=True)
-
-
-# Apple-style centered header (fixed alignment)
-st.markdown("""
-<div style="
-    display: flex; 
-    flex-direction: column;
-    justify-content: center;
-    align-items: center;
-    margin-top: 25px;
-    margin-bottom: 20px;
-">
-    <h1 style="
-        color: #FFFFFFF; 
-        font-size: 42px; 
-        font-weight: 600;
-        margin: 0;
-    ">
-        🔍 AI Code Reviewer
-    </h1>
-    <p style="
-        color: #6e6e73; 
-        font-size: 18px; 
-        margin: 4px 0 0 0;
-    ">
-        Minimal & Clean Apple-Style Interface
-    </p>
-</div>
-""", unsafe_allow_html=True)
+ASSETS = ROOT / "assets"
+
+
+@st.cache_resource
+def prepare_server():
+
+    # once per server process instead of on every rerun
+
+    for d in (INPUTS, OUTPUTS, REPORTS):
+
+        d.mkdir(exist_ok=True)
+
+    # Prometheus metrics (AI_CODE_REVIEWER_METRICS_PORT / _FILE)
+
+    start_exporters_from_env()
+
+
+prepare_server()
+
+
+@st.cache_resource
+def page_assets():
+
+    # static markup and CSS are read and assembled once; reruns reuse the strings
+
+    return {
+        "styles": "<style>\n" + (ASSETS / "styles.css").read_text(encoding="utf-8") + "</style>\n",
+        "header": (ASSETS / "header.html").read_text(encoding="utf-8"),
+        "footer": (ASSETS / "footer.html").read_text(encoding="utf-8"),
+    }
+
+
+@st.cache_resource
+def warm_up_analysis():
+
+    # deferred setup: after the first page is out, load the analyzers in the
+
+    # background so the first review does not pay for imports and plugin discovery
+
+    def load():
+
+        from core.code_analysis import _flake8_engine, warm_up_process_pools
+
+        import core.formatter  # noqa: F401
+
+        try:
+
+            _flake8_engine()
+
+        except Exception:
+
+            # the first analysis reports a broken flake8 itself
+
+            pass
+
+        # workers for large sources, started with the tools already loaded
+
+        warm_up_process_pools()
+
+    thread = threading.Thread(target=load, name="warm-up", daemon=True)
+
+    thread.start()
+
+    return thread
+
+
+@st.cache_resource
+def get_worker_pool():
+
+    # one bounded FIFO pool shared by every session of this server process
+
+    return shared_pool()
+
+
+def run_review(source, source_name, profile, events=None):
+
+    # runs on a pool worker thread, so no Streamlit calls in here; progress goes
+
+    # to the events queue as (kind, payload) and the session renders it
+
+    from core.code_analysis import analyze_source
+
+    from core.formatter import get_formatted_source
+
+    events = events if events is not None else queue.Queue()
+
+    timings = {}
+
+    def format_text():
+
+        format_timings = {}
+
+        with stage(timings, "formatting"), profile_run(
+            Path(source_name).stem + "-formatting", enabled=profile
+        ) as format_profile:
+
+            # in memory too: the formatted text travels in the result, not a file
+
+            success, message, formatted_text = get_formatted_source(
+                source, cache=default_cache(), timings=format_timings
+            )
+
+        events.put(
+            ("formatting", {"success": success, "message": message, "formatted_text": formatted_text})
+        )
+
+        return success, message, formatted_text, format_timings, format_profile
+
+    # black does not need the analysis results, so it runs alongside the analysis
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="review-format") as formatter:
+
+        formatting = formatter.submit(format_text)
+
+        with stage(timings, "analysis"):
+
+            if os.environ.get("AI_CODE_REVIEWER_DAEMON") == "1":
+
+                # shared pre-warmed worker instead of loading the tools in this process
+
+                from core.daemon import analyze_source_via_daemon
+
+                report = analyze_source_via_daemon(source, source_name)
+
+            else:
+
+                # in memory, no file read; incremental: unchanged top-level blocks reuse earlier results
+
+                report = analyze_source(
+                    source,
+                    source_name,
+                    cache=default_cache(),
+                    incremental=True,
+                    profile=profile,
+                    on_result=lambda name, result: events.put(("result", result)),
+                )
+
+        events.put(("analysis", report))
+
+        success, message, formatted_text, format_timings, format_profile = formatting.result()
+
+    return {
+        "report": report,
+        "success": success,
+        "message": message,
+        "formatted_text": formatted_text,
+        "format_timings": format_timings,
+        "format_profile": format_profile,
+        "timings": timings,
+    }
+
+
+# Derived data is cached per result; the _-prefixed arguments are not hashed,
+
+# result_key identifies them
+
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def issue_index(result_key, _flake8_issues):
+
+    # read-only once built, so one shared instance instead of a pickled copy per use
+
+    return IssueIndex(_flake8_issues)
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def complexity_view(result_key, _radon_cc):
 
+    # bounded size (top blocks + histogram) however many blocks there are
 
-st.markdown("""
-<style>
-div[data-testid="stMetricValue"] { 
-    color: #ffffff !important; 
-}
-div[data-testid="stMetricLabel"] { 
-    color: #d0d0d0 !important; 
-}
-</style>
+    return summarize_complexity(_radon_cc)
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def report_download(result_key, report_id):
+
+    return json.dumps(default_store().load(report_id), indent=2)
+
+
+def render_summary(report):
+
+    st.markdown("""
+<h2 style='color:#FFFFFF; font-weight:600; margin-top:10px;'>
+    Summary
+</h2>
 """, unsafe_allow_html=True)
 
-# Sidebar controls
+    # short summary; report may still be partial while analyzers are running
 
-st.sidebar.header("Upload / Options")
+    flake8_issues = report.get("flake8_issues", [])
 
-uploaded = st.sidebar.file_uploader("Upload a Python file (.py)", type=["py"])
+    radon_cc = report.get("radon_cc", {})
 
-use_example = st.sidebar.checkbox("Use example file (example_code.py)", value=True)
+    radon_mi = report.get("radon_mi", {})
 
-run_button = st.sidebar.button("Run Analysis")
+    issue_count = 0
 
+    if isinstance(flake8_issues, list):
 
-# Show example code
+        issue_count = len(flake8_issues)
 
-if use_example and not uploaded:
+    st.metric("Style issues (flake8)", value=issue_count)
 
-    sample_path = INPUTS / "example_code.py"
+    if isinstance(radon_mi, dict) and radon_mi:
 
-    if not sample_path.exists():
+        try:
 
-        sample_path.write_text("# sample file missing")
+            # radon_mi is usually { "filename": { "mi": value, "rank": "A" } }
 
-    uploaded_content = sample_path.read_text(encoding="utf-8")
+            k = list(radon_mi.keys())[0]
 
-else:
+            mi_val = (
+                radon_mi[k].get("mi") if isinstance(radon_mi[k], dict) else None
+            )
 
-    uploaded_content = None
+            if mi_val is not None:
 
+                st.metric("Maintainability Index", value=f"{mi_val:.1f}")
 
-if uploaded:
+        except Exception:
+
+            pass
+
+    # quick suggestions (AI-like summarization)
+
+    suggestions = []
+
+    if issue_count > 0:
+
+        suggestions.append(
+            f"Found {issue_count} style issues — consider fixing PEP8 warnings."
+        )
+
+    # examine radon complexity to produce advice
+
+    try:
+
+        functions = []
+
+        for fname, blocks in radon_cc.items():
+
+            for b in blocks:
+
+                functions.append((b.get("name"), b.get("complexity")))
+
+        high = [f for f in functions if f[1] and f[1] >= 8]
+
+        if high:
+
+            suggestions.append(
+                f"{len(high)} block(s) with high cyclomatic complexity — consider refactoring."
+            )
+
+    except Exception:
+
+        pass
+
+    if not suggestions:
+
+        suggestions = ["No immediate suggestions — code looks clean."]
+
+    for suggestion in suggestions:
+
+        st.write("- " + suggestion)
+
+
+def render_flake8(result_key, flake8_issues, interactive=True):
 
-    uploaded_bytes = uploaded.read()
+    import pandas as pd
 
-    uploaded_content = uploaded_bytes.decode("utf-8")
+    st.header("Flake8 Issues")
 
-    # save to inputs
+    if not (isinstance(flake8_issues, list) and flake8_issues):
 
-    in_file = INPUTS / f"uploaded_{uploaded.name}"
+        st.info(
+            "No flake8 issues found or flake8 not available. See raw output below."
+        )
+
+        st.json(flake8_issues)
+
+        return
+
+    # filtering, sorting and paging run on the server; only one page is sent
+
+    index = issue_index(result_key, flake8_issues)
+
+    for error in index.errors:
+
+        st.warning(f"flake8: {error}")
+
+    if not len(index):
+
+        return
+
+    if not interactive:
+
+        st.caption(
+            f"{len(index)} issues; the first {ISSUE_PAGE_SIZES[0]} are shown."
+            " Filters appear when the review is complete."
+        )
+
+        st.dataframe(
+            pd.DataFrame(index.page(index.select(), 0, ISSUE_PAGE_SIZES[0])), hide_index=True
+        )
+
+        return
+
+    code_counts = index.code_counts()
+
+    max_line = max(index.max_line(), 1)
+
+    # widget keys carry the result key, so a new result starts unfiltered
+
+    code_col, severity_col, first_col, last_col = st.columns([2, 2, 1, 1])
+
+    codes = code_col.multiselect(
+        "Codes",
+        list(code_counts),
+        format_func=lambda code: f"{code} ({code_counts[code]})",
+        key=f"issue_codes_{result_key}",
+    )
+
+    severities = severity_col.multiselect(
+        "Severity", list(index.severity_counts()), key=f"issue_severities_{result_key}"
+    )
 
-    in_file.write_text(uploaded_content, encoding="utf-8")
+    first_line = first_col.number_input(
+        "From line", min_value=1, max_value=max_line, value=1, key=f"issue_first_{result_key}"
+    )
+
+    last_line = last_col.number_input(
+        "To line", min_value=1, max_value=max_line, value=max_line, key=f"issue_last_{result_key}"
+    )
+
+    sort_col, size_col, page_col = st.columns(3)
+
+    sort = sort_col.selectbox("Sort by", SORT_KEYS, key=f"issue_sort_{result_key}")
+
+    page_size = size_col.selectbox(
+        "Rows per page", ISSUE_PAGE_SIZES, index=1, key=f"issue_page_size_{result_key}"
+    )
+
+    rows = index.select(
+        codes=codes, severities=severities, lines=(first_line, last_line), sort=sort
+    )
+
+    pages = max(1, -(-len(rows) // page_size))
+
+    page_key = f"issue_page_{result_key}"
+
+    # session state is the widget's only source of its value (no value=),
+
+    # so the clamp below is not fighting a default
+
+    st.session_state.setdefault(page_key, 1)
+
+    if st.session_state[page_key] > pages:
+
+        # a narrower filter can leave the current page past the end
+
+        st.session_state[page_key] = pages
+
+    page = page_col.number_input("Page", min_value=1, max_value=pages, key=page_key)
+
+    start = (page - 1) * page_size
+
+    st.caption(
+        f"Issues {min(start + 1, len(rows))}–{min(start + page_size, len(rows))}"
+        f" of {len(rows)} matching ({len(index)} total)"
+    )
+
+    st.dataframe(
+        pd.DataFrame(index.page(rows, page - 1, page_size)),
+        hide_index=True,
+        use_container_width=True,
+    )
 
-    working_file_path = str(in_file)
 
-elif uploaded_content is not None:
+def render_complexity(result_key, report):
 
-    # use example
+    st.header("Cyclomatic Complexity (radon)")
 
-    working_file_path = str(INPUTS / "example_code.py")
+    st.markdown("Below: functions / methods and their complexity.")
 
-    # ensure example exists on disk
+    radon_cc = report.get("radon_cc", {})
 
-    (INPUTS / "example_code.py").write_text(uploaded_content, encoding="utf-8")
+    radon_mi = report.get("radon_mi", {})
+
+    if isinstance(radon_cc, dict) and radon_cc:
+
+        view = complexity_view(result_key, radon_cc)
+
+        if view["blocks"]:
+
+            render_complexity_charts(view)
+
+        else:
+
+            st.info("No complexity data available.")
+
+    else:
+
+        st.info("Radon complexity not available. Raw radon output:")
+
+        st.json(radon_cc)
+
+    st.markdown("**Maintainability Index**")
+
+    st.json(radon_mi)
+
+    st.markdown("**Raw & Halstead metrics**")
+
+    st.json({"raw": report.get("radon_raw"), "halstead": report.get("radon_halstead")})
+
+
+def render_complexity_charts(view):
+
+    # charts are drawn client-side by Vega-Lite from at most a few dozen rows
+
+    import altair as alt
+
+    import pandas as pd
+
+    blocks = pd.DataFrame(view["rows"])
+
+    tooltip = ["name", "type", "complexity", "lineno", "rank"]
+
+    if view["mode"] == "detail":
+
+        st.dataframe(blocks, hide_index=True)
+
+        chart = alt.Chart(blocks).mark_bar().encode(
+            x=alt.X("name:N", sort=None, title="Function"),
+            y=alt.Y("complexity:Q", title="Cyclomatic Complexity"),
+            tooltip=tooltip,
+        ).properties(title="Complexity per function")
+
+        st.altair_chart(chart, use_container_width=True)
+
+        return
+
+    total_col, mean_col, max_col = st.columns(3)
+
+    total_col.metric("Blocks", view["blocks"])
+
+    mean_col.metric("Mean complexity", view["mean"])
+
+    max_col.metric("Max complexity", view["max"])
+
+    st.caption(
+        f"{view['blocks']} blocks: showing the {len(view['rows'])} most complex"
+        " and the distribution of all of them."
+    )
+
+    top_chart = alt.Chart(blocks).mark_bar().encode(
+        x=alt.X("complexity:Q", title="Cyclomatic Complexity"),
+        y=alt.Y("name:N", sort="-x", title=None),
+        tooltip=tooltip,
+    ).properties(title=f"Top {len(view['rows'])} blocks")
+
+    distribution = alt.Chart(pd.DataFrame(view["histogram"])).mark_bar().encode(
+        x=alt.X("start:Q", bin="binned", title="Cyclomatic Complexity"),
+        x2="end:Q",
+        y=alt.Y("count:Q", title="Blocks"),
+        tooltip=["start", "end", "count"],
+    ).properties(title="Distribution")
+
+    top_col, distribution_col = st.columns(2)
+
+    top_col.altair_chart(top_chart, use_container_width=True)
+
+    distribution_col.altair_chart(distribution, use_container_width=True)
+
+    st.markdown("**Blocks per rank**")
+
+    st.dataframe(
+        pd.DataFrame([{"rank": rank, "blocks": n} for rank, n in view["ranks"].items()]),
+        hide_index=True,
+    )
+
+    st.markdown("**Most complex blocks**")
+
+    st.dataframe(blocks, hide_index=True)
+
+
+def render_formatted(success, msg, formatted_text):
+
+    st.header("Formatted Code (black)")
+
+    if success:
+
+        st.code(formatted_text, language="python")
+
+        if st.download_button(
+            "Download formatted code",
+            data=formatted_text,
+            file_name="formatted_code.py",
+        ):
+
+            st.success("Downloaded formatted code.")
+
+    else:
+
+        st.warning("Formatting not performed: " + msg)
+
+        st.text(msg)
+
+
+def render_export(result_key, final_report, source_name, report_id):
+
+    import pandas as pd
+
+    st.header("Export & Report")
+
+    store = default_store()
+
+    save_json = report_download(result_key, report_id)
+
+    st.write(f"Saved report #{report_id} to:", store.path)
+
+    history = store.history(final_report["file"])
+
+    if len(history) > 1:
+
+        st.markdown("**History for this file**")
+
+        st.dataframe(pd.DataFrame(history))
+
+    st.download_button(
+        "Download report (JSON)",
+        data=save_json,
+        file_name=f"report_{Path(source_name).stem}.json",
+    )
+
+    for stage_name, profile_info in final_report["profiles"].items():
+
+        if profile_info:
+
+            with st.expander(f"Profile: {stage_name}"):
+
+                st.write("cProfile dump:", profile_info["profile"])
+
+                summary_text = read_file(profile_info["summary"])
+
+                st.download_button(
+                    f"Download {stage_name} profile summary",
+                    data=summary_text,
+                    file_name=Path(profile_info["summary"]).name,
+                )
+
+                st.text(summary_text)
+
+    st.markdown("**Sample report**")
+
+    st.json(final_report)
+
+    st.markdown("You can use this report for further analysis or record-keeping.")
+
+
+def render_performance(app_timings, report, format_timings):
+
+    import pandas as pd
+
+    st.header("Performance")
+
+    rows = []
+
+    for section, stages in (
+        ("app", app_timings),
+        ("analysis", report.get("timings") or {}),
+        ("formatting", format_timings),
+    ):
+
+        for name, record in stages.items():
+
+            rows.append({"section": section, "stage": name, **record})
+
+    st.dataframe(pd.DataFrame(rows))
+
+    st.caption(
+        "wall/cpu in seconds; peak_rss_kb is the process high-water mark after the stage;"
+        " cache is hit/miss where a cache was consulted."
+    )
+
+
+ISSUE_PAGE_SIZES = (50, 100, 250, 500)
+
+
+RESULT_PANELS = [
+    "Summary",
+    "Flake8 Issues",
+    "Complexity (Radon)",
+    "Formatted Code",
+    "Export / Reports",
+]
+
+
+@st.fragment
+def render_results(review, show_performance):
+
+    # only the selected panel is built, and widgets in it rerun just this
+
+    # fragment instead of the whole script
+
+    panels = RESULT_PANELS + (["Performance"] if show_performance else [])
+
+    panel = st.radio(
+        "Results", panels, horizontal=True, key="results_panel", label_visibility="collapsed"
+    )
+
+    report, key = review["report"], review["key"]
+
+    if panel == "Summary":
+
+        render_summary(report)
+
+    elif panel == "Flake8 Issues":
+
+        render_flake8(key, report.get("flake8_issues", []))
+
+    elif panel == "Complexity (Radon)":
+
+        render_complexity(key, report)
+
+    elif panel == "Formatted Code":
+
+        render_formatted(review["success"], review["msg"], review["formatted_text"])
+
+    elif panel == "Export / Reports":
+
+        render_export(key, review["final_report"], review["source_name"], review["report_id"])
+
+    else:
+
+        render_performance(review["app_timings"], report, review["format_timings"])
+
+
+# Header and styles (built once per server process, see page_assets)
+
+assets = page_assets()
+
+st.markdown(assets["styles"] + assets["header"], unsafe_allow_html=True)
+
+# Sidebar controls
+
+st.sidebar.header("Upload / Options")
+
+uploaded = st.sidebar.file_uploader("Upload a Python file (.py)", type=["py"])
+
+use_example = st.sidebar.checkbox("Use example file (example_code.py)", value=True)
+
+show_performance = st.sidebar.checkbox("Show performance tab", value=False)
+
+profile_run_enabled = st.sidebar.checkbox(
+    "Profile this run (cProfile + tracemalloc)", value=profiling_enabled()
+)
+
+run_button = st.sidebar.button("Run Analysis")
+
+
+# Input: an upload or the bundled example (read only, never rewritten)
+
+if uploaded:
+
+    uploaded_content = uploaded.getvalue().decode("utf-8")
+
+    source_name = uploaded.name
+
+elif use_example:
+
+    sample_path = INPUTS / "example_code.py"
+
+    uploaded_content = (
+        sample_path.read_text(encoding="utf-8") if sample_path.exists() else "# sample file missing\n"
+    )
+
+    source_name = "example_code.py"
 
 else:
 
@@ -143,6 +746,21 @@ else:
     st.stop()
 
 
+# Saved edits apply to the input they were made on
+
+input_key = (source_name, source_hash(uploaded_content))
+
+saved_edits = st.session_state.get("saved_edits")
+
+if saved_edits and saved_edits[0] == input_key:
+
+    working_source = saved_edits[1]
+
+else:
+
+    working_source = uploaded_content
+
+
 # Editor area (wide)
 
 st.subheader("Source Code")
@@ -157,7 +775,9 @@ with code_col:
 
     if st.button("Save edits to file"):
 
-        Path(working_file_path).write_text(code_text, encoding="utf-8")
+        st.session_state["saved_edits"] = (input_key, code_text)
+
+        working_source = code_text
 
         st.success("Saved edits.")
 
@@ -166,7 +786,7 @@ with preview_col:
 
     st.markdown("**File preview**")
 
-    st.code(code_text or read_file(working_file_path), language="python")
+    st.code(code_text or working_source, language="python")
 
     st.markdown("---")
 
@@ -189,381 +809,271 @@ if run_button:
 
     st.info("Running analysis — results will appear below.")
 
-    with st.spinner("Analyzing with flake8 & radon..."):
+    review_events = queue.Queue()
 
-        report = analyze_file(working_file_path)
+    # a click during a review reruns the script and abandons that review's
 
-    # Format code using black
+    # progress loop; drop its queued call so it does not hold a worker slot
 
-    formatted_path = OUTPUTS / "formatted_code.py"
+    previous_ticket = st.session_state.pop("review_ticket", None)
 
-    success, msg = get_formatted_copy(working_file_path, str(formatted_path))
+    if previous_ticket is not None:
 
-    st.success("Analysis complete")
-
-    # Layout: Tabs for results
-
-    tabs = st.tabs(
-        [
-            "Summary",
-            "Flake8 Issues",
-            "Complexity (Radon)",
-            "Formatted Code",
-            "Export / Reports",
-        ]
-    )
-
-    # --- Summary Tab
+        previous_ticket.cancel()
 
-    with tabs[0]:
+    try:
 
-        st.markdown("""
-<h2 style='color:#FFFFFF; font-weight:600; margin-top:10px;'>
-    Summary
-</h2>
-""", unsafe_allow_html=True)
+        ticket = get_worker_pool().submit(
+            run_review,
+            working_source,
+            source_name,
+            profile_run_enabled,
+            review_events,
+        )
 
+    except PoolBusy:
 
-        # short summary
+        st.error("The server is busy with other reviews. Please try again in a moment.")
 
-        flake8_issues = report.get("flake8_issues", [])
+        st.stop()
 
-        radon_cc = report.get("radon_cc", {})
+    st.session_state["review_ticket"] = ticket
 
-        radon_mi = report.get("radon_mi", {})
+    # one progress indicator per stage instead of a single spinner
 
-        issue_count = 0
+    progress = {
+        "queue": st.status("Waiting for a free worker...", state="running"),
+        "flake8": st.status("flake8: checking style...", state="running"),
+        "radon": st.status("radon: measuring complexity...", state="running"),
+        "black": st.status("black: formatting...", state="running"),
+    }
 
-        if isinstance(flake8_issues, list):
+    # key for everything derived from this result (see the cache_data helpers)
 
-            issue_count = len(flake8_issues)
+    result_key = uuid.uuid4().hex
 
-        st.metric("Style issues (flake8)", value=issue_count)
+    # Layout: Tabs for results, filled in as each stage finishes
 
-        if isinstance(radon_mi, dict) and radon_mi:
+    tabs = st.tabs(RESULT_PANELS[:4])
 
-            try:
+    panels = [tab.empty() for tab in tabs]
 
-                # radon_mi is usually { "filename": { "mi": value, "rank": "A" } }
+    for panel in panels:
 
-                k = list(radon_mi.keys())[0]
+        panel.caption("Waiting for results...")
 
-                mi_val = (
-                    radon_mi[k].get("mi") if isinstance(radon_mi[k], dict) else None
-                )
+    partial_report = {}
 
-                if mi_val is not None:
+    rendered = set()
 
-                    st.metric("Maintainability Index", value=f"{mi_val:.1f}")
+    app_timings = {}
 
-            except Exception:
+    render_seconds = 0.0
 
-                pass
+    worker_started = False
 
-        # quick suggestions (AI-like summarization)
+    while True:
 
-        suggestions = []
+        try:
 
-        if issue_count > 0:
+            kind, payload = review_events.get(timeout=0.1)
 
-            suggestions.append(
-                f"Found {issue_count} style issues — consider fixing PEP8 warnings."
-            )
+        except queue.Empty:
 
-        # examine radon complexity to produce advice
+            # run_review posts every event before it returns
 
-        try:
+            if ticket.done() and review_events.empty():
 
-            functions = []
+                break
 
-            for fname, blocks in radon_cc.items():
+            position = ticket.position()
 
-                for b in blocks:
+            if position:
 
-                    functions.append((b.get("name"), b.get("complexity")))
+                progress["queue"].update(
+                    label=f"Waiting for a free worker: you are number {position} in the queue."
+                )
 
-            high = [f for f in functions if f[1] and f[1] >= 8]
+            elif not worker_started:
 
-            if high:
+                worker_started = True
 
-                suggestions.append(
-                    f"{len(high)} block(s) with high cyclomatic complexity — consider refactoring."
+                progress["queue"].update(
+                    label=f"Worker started after {ticket.queue_seconds():.1f}s", state="complete"
                 )
 
-        except Exception:
-
-            pass
-
-        if not suggestions:
+            continue
 
-            suggestions = ["No immediate suggestions — code looks clean."]
+        render_started = time.perf_counter()
 
-        for s in suggestions:
+        elapsed = time.monotonic() - ticket.submitted_at
 
-            st.write("- " + s)
+        if kind == "result":
 
-    # --- Flake8 Tab
+            partial_report.update(payload)
 
-    with tabs[1]:
+            app_timings.setdefault("first_result", {"wall": round(elapsed, 4)})
 
-        st.header("Flake8 Issues")
+        elif kind == "analysis":
 
-        if isinstance(flake8_issues, list) and flake8_issues:
+            # cached, coalesced and daemon results arrive only as the whole report
 
-            df = pd.DataFrame(flake8_issues)
+            partial_report.update(payload)
 
-            st.dataframe(df)
+        if "flake8_issues" in partial_report and "flake8" not in rendered:
 
-        else:
+            rendered.add("flake8")
 
-            st.info(
-                "No flake8 issues found or flake8 not available. See raw output below."
+            progress["flake8"].update(
+                label=f"flake8: {len(partial_report['flake8_issues'])} issue records after {elapsed:.1f}s",
+                state="complete",
             )
 
-            st.json(flake8_issues)
-
-    # --- Complexity Tab
+            with panels[1].container():
 
-    with tabs[2]:
+                render_flake8(result_key, partial_report["flake8_issues"], interactive=False)
 
-        st.header("Cyclomatic Complexity (radon)")
+        if "radon_cc" in partial_report and "radon" not in rendered:
 
-        st.markdown("Below: functions / methods and their complexity.")
+            rendered.add("radon")
 
-        if isinstance(radon_cc, dict) and radon_cc:
+            progress["radon"].update(label=f"radon: done after {elapsed:.1f}s", state="complete")
 
-            rows = []
+            with panels[2].container():
 
-            for fname, blocks in radon_cc.items():
+                render_complexity(result_key, partial_report)
 
-                for b in blocks:
+        if kind in ("result", "analysis"):
 
-                    rows.append(
-                        {
-                            "file": fname,
-                            "name": b.get("name"),
-                            "type": b.get("type"),
-                            "complexity": b.get("complexity"),
-                            "lineno": b.get("lineno"),
-                            "rank": b.get("rank"),
-                        }
-                    )
+            with panels[0].container():
 
-            df = pd.DataFrame(rows)
+                render_summary(partial_report)
 
-            if not df.empty:
+        if kind == "formatting":
 
-                st.dataframe(df)
+            progress["black"].update(
+                label=f"black: {'done' if payload['success'] else 'failed'} after {elapsed:.1f}s",
+                state="complete" if payload["success"] else "error",
+            )
 
-                # Chart
+            with panels[3].container():
 
-                fig, ax = plt.subplots()
+                render_formatted(payload["success"], payload["message"], payload["formatted_text"])
 
-                ax.bar(df["name"], df["complexity"])
+        render_seconds += time.perf_counter() - render_started
 
-                ax.set_xlabel("Function")
+    if not worker_started:
 
-                ax.set_ylabel("Cyclomatic Complexity")
+        progress["queue"].update(
+            label=f"Worker started after {ticket.queue_seconds():.1f}s", state="complete"
+        )
 
-                ax.set_title("Complexity per function")
+    st.session_state.pop("review_ticket", None)
 
-                plt.xticks(rotation=45, ha="right")
+    try:
 
-                st.pyplot(fig)
+        finished = ticket.result()
 
-            else:
+    except Exception as e:
 
-                st.info("No complexity data available.")
+        # keep the page alive; the input and sidebar stay usable for another try
 
-        else:
+        st.error(f"The review failed: {e}")
 
-            st.info("Radon complexity not available. Raw radon output:")
+        st.stop()
 
-            st.json(radon_cc)
+    report = finished["report"]
 
-        st.markdown("**Maintainability Index**")
+    success, msg = finished["success"], finished["message"]
 
-        st.json(radon_mi)
+    formatted_text = finished["formatted_text"]
 
-    # --- Formatted Code Tab
+    format_timings = finished["format_timings"]
 
-    with tabs[3]:
+    format_profile = finished["format_profile"]
 
-        st.header("Formatted Code (black)")
+    app_timings["queue_wait"] = {"wall": round(ticket.queue_seconds(), 4)}
 
-        if success:
+    app_timings.update(finished["timings"])
 
-            formatted_text = Path(formatted_path).read_text(encoding="utf-8")
+    app_timings["rendering"] = {"wall": round(render_seconds, 4)}
 
-            st.code(formatted_text, language="python")
+    final_report = {
+        "file": source_name,
+        "flake8_issues": report.get("flake8_issues"),
+        "radon_cc": report.get("radon_cc"),
+        "radon_mi": report.get("radon_mi"),
+        "radon_raw": report.get("radon_raw"),
+        "radon_halstead": report.get("radon_halstead"),
+        "analyzers": report.get("analyzers"),
+        "timings": {
+            "analysis": report.get("timings"),
+            "formatting": format_timings,
+        },
+        "profiles": {
+            "analysis": report.get("profile"),
+            "formatting": format_profile,
+        },
+        "formatting": {
+            "success": success,
+            "message": msg,
+            "changed": formatted_text != working_source if success else None,
+        },
+    }
 
-            if st.download_button(
-                "Download formatted code",
-                data=formatted_text,
-                file_name="formatted_code.py",
-            ):
+    # the result object every later rerun renders from; stored in the report DB once
 
-                st.success("Downloaded formatted code.")
+    st.session_state["review"] = {
+        "key": result_key,
+        "input_key": input_key,
+        "source_name": source_name,
+        "report": report,
+        "final_report": final_report,
+        "report_id": default_store().save(final_report),
+        "success": success,
+        "msg": msg,
+        "formatted_text": formatted_text,
+        "format_timings": format_timings,
+        "app_timings": app_timings,
+    }
 
-        else:
+    st.rerun()
 
-            st.warning("Formatting not performed: " + msg)
 
-            st.text(msg)
+# Results: rendered from the stored result object, one panel at a time
 
-    # --- Export / Reports
+review = st.session_state.get("review")
 
-    with tabs[4]:
+if review and review["input_key"] == input_key:
 
-        st.header("Export & Report")
+    cache_stats = default_cache().stats()
 
-        final_report = {
-            "file": Path(working_file_path).name,
-            "flake8_issues": report.get("flake8_issues"),
-            "radon_cc": report.get("radon_cc"),
-            "radon_mi": report.get("radon_mi"),
-            "formatting": {
-                "success": success,
-                "message": msg,
-                "formatted_file": str(formatted_path) if success else None,
-            },
-        }
+    st.sidebar.caption(
+        f"Result cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses"
+        f" ({cache_stats['entries']} entries)"
+    )
 
-        save_path = REPORTS / f"report_{Path(working_file_path).stem}.json"
+    report = review["report"]
 
-        save_json = json.dumps(final_report, indent=2)
+    if report.get("coalesced"):
 
-        Path(save_path).write_text(save_json, encoding="utf-8")
+        st.caption("Another session was analyzing the same code; its result was shared with you.")
 
-        st.write("Saved report to:", str(save_path))
+    st.success("Analysis complete")
 
-        st.download_button(
-            "Download report (JSON)",
-            data=save_json,
-            file_name=f"report_{Path(working_file_path).stem}.json",
-        )
+    for name, info in report.get("analyzers", {}).items():
 
-        st.markdown("**Sample report**")
-
-        st.json(final_report)
-
-        st.markdown("You can use this report for further analysis or record-keeping.")
-
-# ---- Custom Apple-style CSS ----
-apple_css = """
-<style>
-
-/* Remove Streamlit default padding */
-.block-container {
-    padding-top: 1.5rem;
-    padding-left: 2rem;
-    padding-right: 2rem;
-}
-
-/* Make cards (tabs, editor, preview) look like Apple widgets */
-.stTabs [role="tablist"] {
-    border-bottom: 1px solid #dcdcdc;
-}
-
-.stTabs [role="tab"] {
-    padding: 12px 20px;
-    margin-right: 4px;
-    border-radius: 10px 10px 0 0;
-    font-size: 16px;
-    color: #555;
-}
-
-.stTabs [aria-selected="true"] {
-    background: #ffffff;
-    border: 1px solid #e4e4e4;
-    border-bottom: 1px solid #ffffff;
-    font-weight: 600;
-}
-
-/* Apple-style card for all boxes */
-div.stTextArea, div.stCodeBlock, div.stDataFrame {
-    background: #ffffff !important;
-    border-radius: 14px !important;
-    border: 1px solid #eaeaea !important;
-    padding: 12px !important;
-    box-shadow: 0px 2px 6px rgba(0,0,0,0.06);
-}
-
-/* Buttons — Apple rounded style */
-.stButton>button {
-    background: #007AFF !important;
-    color: white !important;
-    padding: 10px 20px !important;
-    border-radius: 12px !important;
-    border: none;
-    font-size: 15px;
-    transition: 0.2s ease;
-}
-
-.stButton>button:hover {
-    background: #005FCC !important;
-}
-
-/* Sidebar minimal */
-.css-1d391kg {
-    background-color: #F5F5F7 !important;
-}
-
-/* Editor + preview layout tweaks */
-textarea {
-    border-radius: 12px !important;
-}
-
-/* Header */
-h1, h2, h3 {
-    font-family: -apple-system, BlinkMacSystemFont, "San Francisco", "Helvetica Neue", Arial;
-}
-
-/* Metrics */
-div[data-testid="stMetricValue"] {
-    font-size: 32px !important;
-    font-weight: 700;
-    color: #000;
-}
-</style>
-"""
-
-st.markdown("""
-<h2 style='color:#FFFFFF; font-weight:600;'>
-</h2>
-""", unsafe_allow_html=True)
-st.markdown(apple_css, unsafe_allow_html=True)
-st.markdown("""<style>
-/* Remove Streamlit default padding */
-.block-container {
-    padding-top: 1.5rem;
-    padding-left: 2rem;
-    padding-right: 2rem;
-}
-</style>""", unsafe_allow_html=True)   
+        if info.get("status") != "ok":
 
+            st.warning(f"{name} {info.get('status')}: {info.get('error')}")
 
+    render_results(review, show_performance)
 
 # ----------------------------------------
 # 🚀 PYTHON CODE REVIEWER (APPLE-STYLE CARD)
 # ----------------------------------------
 
-st.markdown("""
-<hr><br>
-<div style="
-    font-size: 32px;
-    font-weight: 700;
-    text-align: center;
-    color: white;
-">
-    ☕ PYTHON Code Reviewer
-</div>
-<p style="
-    text-align: center;
-    font-size: 18px;
-    color: #6e6e73;
-    margin-top: -5px;
-">
-</p>
-""", unsafe_allow_html=True)
+st.markdown(assets["footer"], unsafe_allow_html=True)
+
+warm_up_analysis()
 
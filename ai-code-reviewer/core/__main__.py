@@ -0,0 +1,164 @@
+# core/__main__.py
+"""
+Headless entry point: python -m core [paths ...] [--git BASE HEAD]
+
+Analyzes files, directories (recursively), stdin ("-") or the files changed
+between two git refs and streams one JSON report per line. Only imports the analysis modules, never the Streamlit UI.
+"""
+import argparse
+import itertools
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from core.batch import ProjectAggregate, analyze_paths, default_jobs, discover_paths
+from core.cache import DEFAULT_MAX_BYTES, ResultCache, default_cache
+from core.code_analysis import DEFAULT_TIMEOUT, analyze_source
+from core.utils import NDJSONWriter
+
+STORE_BATCH_SIZE = 200
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m core",
+        description="Run flake8 and radon analysis and write JSON Lines reports.",
+    )
+    parser.add_argument("paths", nargs="*", help="files, directories, or - for stdin")
+    parser.add_argument(
+        "-o", "--output",
+        help="write reports here instead of stdout (gzip-compressed if it ends with .gz)",
+    )
+    parser.add_argument(
+        "--per-issue", action="store_true",
+        help="write one record per issue plus one per file instead of one per file",
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=default_jobs(),
+        help="worker processes for multiple files (default: CPU count)",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="do not use the result cache")
+    parser.add_argument("--cache-path", help="result cache file (default: shared cache)")
+    parser.add_argument(
+        "--timeout", type=float, default=DEFAULT_TIMEOUT,
+        help="per-file analyzer deadline in seconds",
+    )
+    parser.add_argument(
+        "--stdin-name", default="stdin", help="file name to report for stdin input"
+    )
+    parser.add_argument(
+        "--summary", action="store_true",
+        help="append a final {\"summary\": ...} line with project totals",
+    )
+    parser.add_argument(
+        "--daemon", action="store_true",
+        help="send work to the pre-warmed analysis daemon (started if needed)",
+    )
+    parser.add_argument(
+        "--git", nargs=2, metavar=("BASE", "HEAD"),
+        help="analyze the .py files changed between two refs, read from git objects",
+    )
+    parser.add_argument("--repo", default=".", help="git repository for --git (default: .)")
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="profile each analysis (cProfile + tracemalloc) into outputs/profiles/",
+    )
+    parser.add_argument(
+        "--metrics-file", metavar="PATH",
+        help="write Prometheus text metrics for the run to this file at the end",
+    )
+    parser.add_argument(
+        "--store", metavar="PATH",
+        help="also save the reports to this SQLite report store",
+    )
+    return parser
+
+
+def _daemon_reports(args: argparse.Namespace, files: List[str]) -> Iterator[Dict[str, Any]]:
+    from core.daemon import CLIENT_GRACE, DaemonClient, start_daemon
+    if not start_daemon():
+        raise SystemExit("could not start the analysis daemon")
+    wait = args.timeout + CLIENT_GRACE if args.timeout is not None else None
+    found, errors = discover_paths(files)
+    yield from errors
+    with DaemonClient(timeout=wait) as client:
+        for f in found:
+            try:
+                source = Path(f).read_text(encoding="utf-8")
+            except Exception as e:
+                yield {"file": f, "error": str(e)}
+                continue
+            report = client.analyze(source, f, timeout=args.timeout, cache=not args.no_cache)
+            report["file"] = f
+            yield report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not args.paths and not args.git:
+        parser.error("give paths to analyze, - for stdin, or --git BASE HEAD")
+    if args.profile:
+        # read by analyze_file here and in the batch worker processes
+        os.environ["AI_CODE_REVIEWER_PROFILE"] = "1"
+    cache = None
+    if not args.no_cache:
+        cache = ResultCache(args.cache_path, DEFAULT_MAX_BYTES) if args.cache_path else default_cache()
+    store = None
+    if args.store:
+        from core.report_store import ReportStore
+        store = ReportStore(args.store)
+    if args.output:
+        out = NDJSONWriter(args.output, per_issue=args.per_issue)
+    else:
+        out = NDJSONWriter(stream=sys.stdout, per_issue=args.per_issue)
+    aggregate = ProjectAggregate()
+    try:
+        reports = []
+        if "-" in args.paths:
+            source = sys.stdin.read()
+            if args.daemon:
+                from core.daemon import analyze_source_via_daemon
+                report = analyze_source_via_daemon(
+                    source, args.stdin_name, timeout=args.timeout, cache=not args.no_cache
+                )
+            else:
+                report = analyze_source(source, args.stdin_name, args.timeout, cache=cache)
+            report["file"] = args.stdin_name
+            reports.append(report)
+        if args.git:
+            from core.git_changes import analyze_git_changes
+            changes = analyze_git_changes(args.repo, *args.git, cache=cache, timeout=args.timeout)
+            reports = itertools.chain(reports, changes)
+        files = [p for p in args.paths if p != "-"]
+        if args.daemon:
+            batch = _daemon_reports(args, files)
+        else:
+            batch = analyze_paths(files, jobs=args.jobs, cache=cache, timeout=args.timeout)
+        pending: List[Dict[str, Any]] = []
+        for report in itertools.chain(reports, batch):
+            aggregate.add(report)
+            if "error" in report:
+                print(f"{report.get('file')}: {report['error']}", file=sys.stderr)
+            out.write_report(report)
+            out.flush()
+            if store is not None:
+                pending.append(report)
+                if len(pending) >= STORE_BATCH_SIZE:
+                    store.save_many(pending)
+                    pending = []
+        if pending:
+            store.save_many(pending)
+        if args.summary:
+            out.write({"summary": aggregate.as_dict()})
+    finally:
+        out.close()
+        if args.metrics_file:
+            from core.metrics import write_metrics_file
+            write_metrics_file(args.metrics_file)
+    return 1 if aggregate.failed_files else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,269 @@
+# core/batch.py
+import heapq
+import os
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from core.cache import ResultCache
+from core.code_analysis import DEFAULT_TIMEOUT, _flake8_engine, analyze_file
+from core.metrics import (
+    QUEUE_DEPTH,
+    WORKER_BUSY_SECONDS,
+    WORKERS,
+    WORKERS_BUSY,
+    observe_analysis,
+)
+
+# Directory names never descended into (flake8's default excludes plus venvs)
+DEFAULT_EXCLUDES = {
+    ".svn", "CVS", ".bzr", ".hg", ".git", "__pycache__", ".tox", ".nox",
+    ".eggs", ".venv", "venv", ".mypy_cache", ".pytest_cache", "node_modules",
+}
+
+
+def _raise(error: OSError) -> None:
+    raise error
+
+
+def discover_python_files(
+    root: str,
+    excludes: Iterable[str] = DEFAULT_EXCLUDES,
+    on_error: Callable[[OSError], None] = _raise,
+) -> List[str]:
+    """
+    Return every .py file under root (or root itself if it is a file), sorted.
+    A missing root raises FileNotFoundError; a directory that cannot be listed
+    is passed to on_error, which raises by default.
+    """
+    root_path = Path(root)
+    if root_path.is_file():
+        return [str(root_path)]
+    if not root_path.is_dir():
+        raise FileNotFoundError(2, "No such file or directory", root)
+    excludes = set(excludes)
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root_path, onerror=on_error):
+        dirnames[:] = sorted(
+            d for d in dirnames if d not in excludes and not d.endswith(".egg-info")
+        )
+        for name in sorted(filenames):
+            if name.endswith(".py"):
+                found.append(os.path.join(dirpath, name))
+    return found
+
+
+def discover_paths(paths: Iterable[str]) -> Tuple[List[str], List[Dict[str, Any]]]:
+    """
+    discover_python_files for each path. Returns the files and an error
+    report ({"file", "error"}) for each path or directory that is missing or
+    cannot be read, so callers can report those instead of skipping them.
+    """
+    files: List[str] = []
+    errors: List[OSError] = []
+    for p in paths:
+        try:
+            files.extend(discover_python_files(p, on_error=errors.append))
+        except OSError as e:
+            errors.append(e)
+    return files, [{"file": e.filename or "", "error": str(e)} for e in errors]
+
+
+def _size(file_path: str) -> Optional[int]:
+    try:
+        return os.path.getsize(file_path)
+    except OSError:
+        return None
+
+
+def default_jobs() -> int:
+    return os.cpu_count() or 1
+
+
+@lru_cache(maxsize=None)
+def _worker_cache(path: str, max_bytes: int) -> ResultCache:
+    return ResultCache(path, max_bytes)
+
+
+def _warm_worker() -> None:
+    # files are already spread over one worker per core, so large files must
+    # not start analyzer processes of their own on top
+    os.environ["AI_CODE_REVIEWER_ANALYZER_PROCESSES"] = "0"
+    # load flake8 plugins once per worker instead of on its first file
+    try:
+        _flake8_engine()
+    except Exception:
+        pass
+
+
+def _analyze_one(
+    file_path: str, cache_spec: Optional[Tuple[str, int]], timeout: Optional[float]
+) -> Dict[str, Any]:
+    cache = _worker_cache(*cache_spec) if cache_spec else None
+    report = analyze_file(file_path, timeout=timeout, cache=cache)
+    report["file"] = file_path
+    return report
+
+
+def analyze_paths(
+    paths: Iterable[str],
+    jobs: Optional[int] = None,
+    cache: Optional[ResultCache] = None,
+    timeout: Optional[float] = DEFAULT_TIMEOUT,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Analyze many files on a process pool (one worker per core by default) and
+    yield each report, with a "file" key, as soon as it finishes. Directories
+    in paths are expanded with discover_paths; paths that are missing or
+    unreadable come first, as error reports. Only a bounded number of files is
+    in flight at a time, so memory does not grow with the file count. If a
+    worker dies, the files in flight fail with it and the rest go on in a
+    fresh pool.
+    """
+    files, errors = discover_paths(paths)
+    yield from errors
+    jobs = jobs or default_jobs()
+    cache_spec = (cache.path, cache.max_bytes) if cache is not None else None
+    if jobs <= 1 or len(files) <= 1:
+        # not worth starting a pool
+        for f in files:
+            yield _analyze_one(f, cache_spec, timeout)
+        return
+    pending = iter(files)
+    unfinished = len(files)
+    WORKERS.set(jobs, pool="batch")
+    pool = ProcessPoolExecutor(max_workers=jobs, initializer=_warm_worker)
+    try:
+        in_flight = {}
+
+        def submit_more() -> None:
+            nonlocal pool
+            while len(in_flight) < jobs * 4:
+                f = next(pending, None)
+                if f is None:
+                    break
+                try:
+                    future = pool.submit(_analyze_one, f, cache_spec, timeout)
+                except BrokenProcessPool:
+                    # the futures already in flight fail with the dead pool
+                    pool.shutdown(wait=False)
+                    pool = ProcessPoolExecutor(max_workers=jobs, initializer=_warm_worker)
+                    future = pool.submit(_analyze_one, f, cache_spec, timeout)
+                in_flight[future] = f
+            # workers record metrics in their own process; the pool view is kept here
+            busy = min(len(in_flight), jobs)
+            WORKERS_BUSY.set(busy, pool="batch")
+            QUEUE_DEPTH.set(unfinished - busy, pool="batch")
+
+        submit_more()
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                f = in_flight.pop(future)
+                unfinished -= 1
+                try:
+                    report = future.result()
+                except Exception as e:
+                    yield {"file": f, "error": str(e)}
+                    continue
+                observe_analysis(report, _size(f))
+                total = (report.get("timings") or {}).get("total")
+                if total:
+                    WORKER_BUSY_SECONDS.inc(total["wall"], pool="batch")
+                yield report
+            submit_more()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+    WORKERS_BUSY.set(0, pool="batch")
+
+
+def analyze_directory(
+    root: str,
+    jobs: Optional[int] = None,
+    cache: Optional[ResultCache] = None,
+    timeout: Optional[float] = DEFAULT_TIMEOUT,
+) -> Iterator[Dict[str, Any]]:
+    """
+    analyze_paths for every .py file under root.
+    """
+    return analyze_paths([root], jobs=jobs, cache=cache, timeout=timeout)
+
+
+class ProjectAggregate:
+    """
+    Project-level summary built incrementally from per-file reports, so a
+    batch run can be summarized without keeping every report in memory.
+    """
+
+    def __init__(self, top_n: int = 10):
+        self.top_n = top_n
+        self.files = 0
+        self.failed_files: List[str] = []
+        self.issue_codes: Counter = Counter()
+        self.blocks = 0
+        self.complexity_total = 0
+        self.mi_total = 0.0
+        self.mi_files = 0
+        self.sloc = 0
+        self.cached = 0
+        self._worst_blocks: List[Tuple[int, str, str, int]] = []
+        self._worst_mi: List[Tuple[float, str]] = []
+
+    def add(self, report: Dict[str, Any]) -> None:
+        self.files += 1
+        file_path = report.get("file", "")
+        statuses = report.get("analyzers", {})
+        if "error" in report or any(s.get("status") != "ok" for s in statuses.values()):
+            self.failed_files.append(file_path)
+        if report.get("cached"):
+            self.cached += 1
+        for issue in report.get("flake8_issues") or []:
+            if "code" in issue:
+                self.issue_codes[issue["code"]] += 1
+        for blocks in (report.get("radon_cc") or {}).values():
+            if not isinstance(blocks, list):
+                continue
+            for b in blocks:
+                self.blocks += 1
+                self.complexity_total += b.get("complexity", 0)
+                item = (b.get("complexity", 0), file_path, b.get("name"), b.get("lineno"))
+                if len(self._worst_blocks) < self.top_n:
+                    heapq.heappush(self._worst_blocks, item)
+                else:
+                    heapq.heappushpop(self._worst_blocks, item)
+        for value in (report.get("radon_mi") or {}).values():
+            if isinstance(value, dict) and "mi" in value:
+                self.mi_total += value["mi"]
+                self.mi_files += 1
+                # min-heap on -mi keeps the lowest scores
+                item = (-value["mi"], file_path)
+                if len(self._worst_mi) < self.top_n:
+                    heapq.heappush(self._worst_mi, item)
+                else:
+                    heapq.heappushpop(self._worst_mi, item)
+        for value in (report.get("radon_raw") or {}).values():
+            if isinstance(value, dict):
+                self.sloc += value.get("sloc", 0)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "files": self.files,
+            "failed_files": self.failed_files,
+            "cached_files": self.cached,
+            "issues": sum(self.issue_codes.values()),
+            "issues_by_code": dict(self.issue_codes.most_common()),
+            "blocks": self.blocks,
+            "average_complexity": self.complexity_total / self.blocks if self.blocks else 0.0,
+            "average_mi": self.mi_total / self.mi_files if self.mi_files else None,
+            "sloc": self.sloc,
+            "worst_blocks": [
+                {"complexity": c, "file": f, "name": n, "lineno": l}
+                for c, f, n, l in sorted(self._worst_blocks, reverse=True)
+            ],
+            "worst_mi_files": [
+                {"file": f, "mi": -m} for m, f in sorted(self._worst_mi, reverse=True)
+            ],
+        }
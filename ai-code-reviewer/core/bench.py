@@ -0,0 +1,249 @@
+# core/bench.py
+"""
+Benchmark suite: python -m core.bench [--sizes 1000,10000,100000] [--repeat 3]
+
+Times run_flake8, run_radon_cc, run_radon_mi, analyze_file (uncached) and
+run_black on every file in inputs/ and on generated modules of the given line
+counts (built with core.corpus), plus the app's cold start (app_startup: a
+fresh interpreter rendering the first page). Results are written as JSON and, if a baseline exists, compared to it:
+a target whose median time grew by more than --threshold is a regression and
+the exit status is 1. --update-baseline makes this run the new baseline.
+"""
+import argparse
+import json
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from core.code_analysis import (
+    analysis_fingerprint,
+    analyze_file,
+    run_flake8,
+    run_radon_cc,
+    run_radon_mi,
+)
+from core.batch import discover_python_files
+from core.corpus import generate_module
+from core.formatter import _black_version, run_black
+
+ROOT = Path(__file__).parent.parent
+INPUTS = ROOT / "inputs"
+BENCH_DIR = ROOT / "outputs" / "benchmarks"
+DEFAULT_SIZES = (1000, 10000, 100000)
+DEFAULT_THRESHOLD = 0.25
+# differences below this many seconds are timer noise, never regressions
+MIN_REGRESSION_SECONDS = 0.01
+STARTUP_TARGET = "app_startup"
+_FIRST_RENDER = (
+    "from streamlit.testing.v1 import AppTest\n"
+    "app = AppTest.from_file({path!r}, default_timeout=120).run()\n"
+    "raise SystemExit(1 if app.exception else 0)\n"
+)
+
+
+def _black_on_copy(file_path: str, scratch: str) -> Any:
+    # black formats in place, so give it a fresh copy every run
+    copy = Path(scratch) / ("black_" + Path(file_path).name)
+    shutil.copyfile(file_path, copy)
+    return run_black(str(copy))
+
+
+def bench_targets(scratch: str) -> Dict[str, Callable[[str], Any]]:
+    return {
+        "run_flake8": run_flake8,
+        "run_radon_cc": run_radon_cc,
+        "run_radon_mi": run_radon_mi,
+        "analyze_file": analyze_file,
+        "run_black": lambda path: _black_on_copy(path, scratch),
+    }
+
+
+def _summary(runs: List[float]) -> Dict[str, Any]:
+    return {
+        "median": round(statistics.median(runs), 5),
+        "min": round(min(runs), 5),
+        "runs": [round(r, 5) for r in runs],
+    }
+
+
+def bench_startup(repeat: int = 3) -> Dict[str, Any]:
+    """
+    Cold start of the Streamlit app. Every run is a new interpreter that
+    imports Streamlit and runs app.py once headless (streamlit.testing's
+    AppTest), i.e. everything up to the first rendered page. "python -c pass"
+    is timed as the floor. Skipped, with a note on stderr, where Streamlit is
+    not installed.
+    """
+    commands = {
+        "interpreter": [sys.executable, "-c", "pass"],
+        "first_render": [sys.executable, "-c", _FIRST_RENDER.format(path=str(ROOT / "app.py"))],
+    }
+    results: Dict[str, Any] = {}
+    for name, command in commands.items():
+        runs = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            proc = subprocess.run(command, cwd=ROOT, capture_output=True, text=True)
+            runs.append(time.perf_counter() - start)
+            if proc.returncode != 0:
+                last_line = (proc.stderr.strip().splitlines() or [f"exit status {proc.returncode}"])[-1]
+                print(f"{STARTUP_TARGET}:{name} skipped: {last_line}", file=sys.stderr)
+                break
+        else:
+            results[f"{STARTUP_TARGET}:{name}"] = _summary(runs)
+    return results
+
+
+def bench_files(scratch: str, sizes: List[int], corpus: Optional[str] = None) -> List[str]:
+    files = sorted(str(p) for p in INPUTS.glob("*.py"))
+    for lines in sizes:
+        path = Path(scratch) / f"synthetic_{lines}.py"
+        # fixed seed per size, so every run and every version sees the same module
+        source = generate_module(random.Random(f"bench:{lines}"), lines, violation_density=0.02)
+        path.write_text(source, encoding="utf-8")
+        files.append(str(path))
+    if corpus:
+        files += discover_python_files(corpus)
+    return files
+
+
+def _label(file_path: str, corpus: Optional[str] = None) -> str:
+    if corpus and Path(file_path).is_relative_to(corpus):
+        return "corpus/" + Path(file_path).relative_to(corpus).as_posix()
+    return Path(file_path).name
+
+
+def run_benchmarks(
+    sizes: List[int],
+    repeat: int = 3,
+    targets: Optional[List[str]] = None,
+    corpus: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Run every target on every file `repeat` times (after one warm-up call per
+    target) and return {"meta": ..., "results": {"target:file": {...}}}.
+    corpus adds the .py files of a directory made by core.corpus.
+    """
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory(prefix="ai-code-reviewer-bench-") as scratch:
+        all_targets = bench_targets(scratch)
+        names = targets or list(all_targets) + [STARTUP_TARGET]
+        files = bench_files(scratch, sizes, corpus)
+        for name in names:
+            if name == STARTUP_TARGET:
+                results.update(bench_startup(repeat))
+                continue
+            fn = all_targets[name]
+            # imports, plugin discovery and config loading are not what we measure
+            fn(files[0])
+            for file_path in files:
+                runs = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    fn(file_path)
+                    runs.append(time.perf_counter() - start)
+                results[f"{name}:{_label(file_path, corpus)}"] = {
+                    **_summary(runs),
+                    "lines": len(Path(file_path).read_text(encoding="utf-8").splitlines()),
+                }
+    meta = {
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "repeat": repeat,
+        "tools": {
+            "flake8": analysis_fingerprint().get("flake8"),
+            "radon": analysis_fingerprint().get("radon"),
+            "black": _black_version(),
+        },
+    }
+    return {"meta": meta, "results": results}
+
+
+def compare(
+    current: Dict[str, Any], baseline: Dict[str, Any], threshold: float = DEFAULT_THRESHOLD
+) -> List[Dict[str, Any]]:
+    """
+    One row per benchmark present in both runs, with the median ratio and
+    whether it counts as a regression.
+    """
+    rows = []
+    for key, result in current["results"].items():
+        base = baseline.get("results", {}).get(key)
+        if not base:
+            continue
+        ratio = result["median"] / base["median"] if base["median"] else float("inf")
+        regression = (
+            ratio > 1 + threshold
+            and result["median"] - base["median"] > MIN_REGRESSION_SECONDS
+        )
+        rows.append({
+            "benchmark": key,
+            "baseline": base["median"],
+            "current": result["median"],
+            "ratio": round(ratio, 3),
+            "regression": regression,
+        })
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m core.bench")
+    parser.add_argument(
+        "--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+        help="line counts of generated modules, comma separated ('' for none)",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per benchmark")
+    parser.add_argument(
+        "--corpus", help="also benchmark a directory generated with python -m core.corpus",
+    )
+    parser.add_argument(
+        "--targets",
+        help="comma separated subset of: " + ", ".join([*bench_targets(""), STARTUP_TARGET]),
+    )
+    parser.add_argument("-o", "--output", default=str(BENCH_DIR / "latest.json"))
+    parser.add_argument("--baseline", default=str(BENCH_DIR / "baseline.json"))
+    parser.add_argument(
+        "--threshold", type=float, default=DEFAULT_THRESHOLD,
+        help="allowed median slowdown before flagging (0.25 = 25%%)",
+    )
+    parser.add_argument(
+        "--update-baseline", action="store_true", help="save this run as the baseline"
+    )
+    args = parser.parse_args(argv)
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    targets = args.targets.split(",") if args.targets else None
+
+    current = run_benchmarks(sizes, args.repeat, targets, args.corpus)
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    Path(args.output).write_text(json.dumps(current, indent=2), encoding="utf-8")
+
+    for key, result in current["results"].items():
+        print(f"{key:60} {result['median']:10.4f}s")
+    regressions = []
+    baseline_path = Path(args.baseline)
+    if baseline_path.exists() and not args.update_baseline:
+        baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+        rows = compare(current, baseline, args.threshold)
+        regressions = [r for r in rows if r["regression"]]
+        print(f"\ncompared {len(rows)} benchmarks with {baseline_path}")
+        for r in regressions:
+            print(f"REGRESSION {r['benchmark']}: {r['baseline']:.4f}s -> {r['current']:.4f}s"
+                  f" (x{r['ratio']})")
+    if args.update_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(args.output, baseline_path)
+        print(f"\nbaseline saved to {baseline_path}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
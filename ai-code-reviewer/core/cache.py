@@ -0,0 +1,161 @@
+# core/cache.py
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+DEFAULT_CACHE_PATH = Path(__file__).parent.parent / ".cache" / "results.sqlite"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def source_hash(text: str) -> str:
+    """
+    Content hash used as the base of every cache key.
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def make_key(kind: str, content_hash: str, fingerprint: Dict[str, Any]) -> str:
+    """
+    Combine what is being cached (kind), the source hash and a fingerprint of
+    the tool versions and effective config into one key.
+    """
+    blob = json.dumps(
+        {"kind": kind, "source": content_hash, "tools": fingerprint},
+        sort_keys=True,
+        default=repr,
+    )
+    return kind + ":" + hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    Persistent JSON result cache in a SQLite file, capped at max_bytes with
+    least-recently-used eviction. Hit/miss counters are stored alongside the
+    entries so they cover every process sharing the file.
+    """
+
+    def __init__(self, path: str = str(DEFAULT_CACHE_PATH), max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = str(path)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            if self.path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+                " size INTEGER NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS entries_lru ON entries (last_access)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS counters ("
+                " name TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+            )
+
+    def _bump(self, name: str) -> None:
+        self._conn.execute(
+            "INSERT INTO counters (name, value) VALUES (?, 1)"
+            " ON CONFLICT(name) DO UPDATE SET value = value + 1",
+            (name,),
+        )
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Return the cached value for key, or None on a miss.
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._bump("misses")
+                return None
+            self._conn.execute(
+                "UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key)
+            )
+            self._bump("hits")
+        return json.loads(row[0])
+
+    def put(self, key: str, value: Any) -> None:
+        """
+        Store value (must be JSON serializable) and evict the least recently
+        used entries until the cache fits in max_bytes again.
+        """
+        data = json.dumps(value)
+        size = len(data.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, last_access)"
+                " VALUES (?, ?, ?, ?)",
+                (key, data, size, time.time()),
+            )
+            total = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            evicted = 0
+            for old_key, old_size in self._conn.execute(
+                "SELECT key, size FROM entries WHERE key != ? ORDER BY last_access",
+                (key,),
+            ).fetchall():
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (old_key,))
+                total -= old_size
+                evicted += 1
+                if total <= self.max_bytes:
+                    break
+            self._conn.execute(
+                "INSERT INTO counters (name, value) VALUES ('evictions', ?)"
+                " ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                (evicted,),
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return {hits, misses, evictions, hit_ratio, entries, bytes, max_bytes}.
+        """
+        with self._lock:
+            counters = dict(self._conn.execute("SELECT name, value FROM counters"))
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+        hits = counters.get("hits", 0)
+        misses = counters.get("misses", 0)
+        return {
+            "hits": hits,
+            "misses": misses,
+            "evictions": counters.get("evictions", 0),
+            "hit_ratio": hits / (hits + misses) if hits + misses else 0.0,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+        }
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.execute("DELETE FROM counters")
+
+
+@lru_cache(maxsize=None)
+def default_cache() -> ResultCache:
+    """
+    Process-wide cache. AI_CODE_REVIEWER_CACHE overrides the file location and
+    AI_CODE_REVIEWER_CACHE_MAX_BYTES the size cap.
+    """
+    path = os.environ.get("AI_CODE_REVIEWER_CACHE", str(DEFAULT_CACHE_PATH))
+    max_bytes = int(os.environ.get("AI_CODE_REVIEWER_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+    return ResultCache(path, max_bytes)
@@ -1,25 +1,243 @@
 # core/code_analysis.py
 
+import ast
+
+import copy
+
 import subprocess
 
 import json
 
-from typing import Dict, Any, List, Tuple
+import os
+
+import sys
+
+import threading
+
+import time
+
+from concurrent.futures import Executor, ThreadPoolExecutor, as_completed
+
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+
+from functools import lru_cache
+
+from pathlib import Path
+
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+from core.cache import ResultCache, make_key, source_hash
+
+from core.instrument import note_subprocess, stage, total_record
+
+from core.metrics import observe_analysis
+
+from core.pool import default_workers
+
+from core.profiling import InlineExecutor, profile_run, profiling_enabled
+
+from core.singleflight import SingleFlight
+
+from core.warm_processes import WarmProcessPool
+
+
+class _Flake8Engine:
+    """
+
+    In-process flake8: options, config and plugins are loaded once and reused
+
+    for every check instead of paying a fresh interpreter start per file.
+
+    """
+
+    def __init__(self) -> None:
+
+        from flake8.options.parse_args import parse_args
+
+        from flake8.style_guide import StyleGuideManager
+
+        from flake8.formatting.base import BaseFormatter
+
+        self.plugins, self.options = parse_args([])
+
+        # The guide is only used for select/ignore/per-file-ignores decisions,
+
+        # so the formatter it is given never emits anything.
+
+        self.guide = StyleGuideManager(self.options, BaseFormatter(self.options))
+
+    def check(
+        self,
+        file_path: str,
+        lines: Optional[List[str]] = None,
+        plugins: Any = None,
+        tree: Optional[ast.AST] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+
+        plugins restricts the run to a subset of self.plugins.checkers.
+
+        With tree (an already parsed module for lines) only the AST plugins run,
+
+        on that tree, and the source is never re-parsed or tokenized.
+
+        """
+
+        from flake8.checker import FileChecker
+
+        from flake8.processor import FileProcessor
+
+        from flake8.style_guide import Decision
+
+        from flake8.violation import Violation
+
+        class _Processor(FileProcessor):
+
+            def build_ast(self):
+
+                return tree if tree is not None else super().build_ast()
+
+            def noqa_line_for(self, line_number):
+
+                if tree is None:
+
+                    return super().noqa_line_for(line_number)
+
+                # physical line only: the multi-line noqa lookup tokenizes the file
+
+                if 1 <= line_number <= len(self.lines):
+
+                    return self.lines[line_number - 1]
+
+                return None
+
+        class _Checker(FileChecker):
+
+            def _make_processor(self):
+
+                if lines is None:
+
+                    return super()._make_processor()
+
+                return _Processor(self.filename, self.options, lines=list(lines))
+
+            def run_checks(self):
+
+                if tree is None or self.processor is None or not self.should_process:
+
+                    return super().run_checks()
+
+                self.run_ast_checks()
+
+                return self.display_name, self.results, self.statistics
+
+        _, results, _ = _Checker(
+            filename=file_path,
+            plugins=plugins if plugins is not None else self.plugins.checkers,
+            options=self.options,
+        ).run_checks()
+
+        guide = self.guide.style_guide_for(file_path)
+
+        issues = []
+
+        for code, row, col, text, physical_line in sorted(results, key=lambda r: (r[1], r[2])):
+
+            # flake8 reports 0-indexed columns; the CLI output is 1-indexed
+
+            error = Violation(code, file_path, row, (col or 0) + 1, text, physical_line)
+
+            if guide.should_report_error(error.code) is not Decision.Selected:
+
+                continue
+
+            if error.is_inline_ignored(self.options.disable_noqa):
+
+                continue
+
+            issues.append(
+                {
+                    "line": error.line_number,
+                    "col": error.column_number,
+                    "code": error.code,
+                    "message": error.text.strip(),
+                }
+            )
+
+        return issues
+
+
+_flake8_engine_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def _build_flake8_engine() -> _Flake8Engine:
+
+    return _Flake8Engine()
 
 
-def run_flake8(file_path: str) -> List[Dict[str, Any]]:
+def _flake8_engine() -> _Flake8Engine:
+
+    # analyzers run on worker threads; make sure plugins are only loaded once
+
+    with _flake8_engine_lock:
+
+        return _build_flake8_engine()
+
+
+def run_flake8(
+    file_path: str, backend: str = "auto", source: Optional[str] = None
+) -> List[Dict[str, Any]]:
     """
 
     Runs flake8 on the provided file and returns a list of issues.
 
     Each issue is a dict: {line, col, code, message}
 
+    backend is "inprocess", "subprocess" or "auto" (in-process, falling back
+
+    to the CLI when flake8 cannot be imported or fails internally).
+
+    If source is given the in-process engine checks it instead of re-reading the file.
+
+    """
+
+    if backend == "subprocess":
+
+        return run_flake8_subprocess(file_path)
+
+    try:
+
+        lines = source.splitlines(True) if source is not None else None
+
+        return _flake8_engine().check(file_path, lines)
+
+    except Exception as e:
+
+        if backend == "inprocess":
+
+            if isinstance(e, ImportError):
+
+                return [{"error": "flake8 not installed."}]
+
+            return [{"error": str(e)}]
+
+        return run_flake8_subprocess(file_path)
+
+
+def run_flake8_subprocess(file_path: str) -> List[Dict[str, Any]]:
+    """
+
+    Runs the flake8 CLI in a subprocess. Same output as run_flake8.
+
     """
 
     try:
 
         # Using flake8 CLI for predictable output
 
+        note_subprocess()
+
         proc = subprocess.run(
             ["flake8", "--format=%(row)d:%(col)d:%(code)s:%(text)s", file_path],
             capture_output=True,
@@ -63,7 +281,153 @@ def run_flake8(file_path: str) -> List[Dict[str, Any]]:
         return [{"error": str(e)}]
 
 
-def run_radon_cc(file_path: str) -> Dict[str, Any]:
+RADON_KEYS = ("radon_cc", "radon_mi", "radon_raw", "radon_halstead")
+
+
+def run_radon(
+    file_path: str, source: Optional[str] = None, metrics: Tuple[str, ...] = RADON_KEYS
+) -> Dict[str, Any]:
+    """
+
+    Runs radon in-process from a single parse of the source.
+
+    The same AST feeds cyclomatic complexity, Halstead metrics and the
+
+    maintainability index; raw metrics come from one tokenize pass.
+
+    Returns {radon_cc, radon_mi, radon_raw, radon_halstead}, each keyed by
+
+    file_path like the radon CLI JSON output.
+
+    metrics limits the run to those keys and the passes they need: radon_cc
+
+    only walks the tree for complexity, radon_mi needs the complexity,
+
+    Halstead and raw passes it is computed from.
+
+    """
+
+    from radon.complexity import sorted_results
+
+    from radon.visitors import ComplexityVisitor
+
+    from radon.metrics import h_visit_ast, mi_compute, mi_rank
+
+    from radon.raw import analyze
+
+    from radon.cli.tools import cc_to_dict, raw_to_dict
+
+    try:
+
+        if source is None:
+
+            source = Path(file_path).read_text(encoding="utf-8")
+
+        tree = ast.parse(source)
+
+        raw = analyze(source) if "radon_mi" in metrics or "radon_raw" in metrics else None
+
+    except Exception as e:
+
+        error = {file_path: {"error": str(e)}}
+
+        return {key: error for key in metrics}
+
+    report: Dict[str, Any] = {}
+
+    if "radon_cc" in metrics or "radon_mi" in metrics:
+
+        visitor = ComplexityVisitor.from_ast(tree)
+
+    if "radon_mi" in metrics or "radon_halstead" in metrics:
+
+        halstead = h_visit_ast(tree)
+
+    if "radon_cc" in metrics:
+
+        cc_blocks = [cc_to_dict(b) for b in sorted_results(visitor.blocks)]
+
+        report["radon_cc"] = {file_path: cc_blocks} if cc_blocks else {}
+
+    if "radon_mi" in metrics:
+
+        # Same inputs as radon.metrics.mi_parameters with multi=True (the CLI default)
+
+        comments = (raw.comments + raw.multi) / float(raw.sloc) * 100 if raw.sloc else 0
+
+        mi = mi_compute(
+            halstead.total.volume, visitor.total_complexity, raw.lloc, comments
+        )
+
+        report["radon_mi"] = {file_path: {"mi": mi, "rank": mi_rank(mi)}}
+
+    if "radon_raw" in metrics:
+
+        report["radon_raw"] = {file_path: raw_to_dict(raw)}
+
+    if "radon_halstead" in metrics:
+
+        report["radon_halstead"] = {
+            file_path: {
+                "total": halstead.total._asdict(),
+                "functions": {
+                    name: result._asdict() for name, result in halstead.functions
+                },
+            }
+        }
+
+    return report
+
+
+def run_radon_cc(file_path: str, backend: str = "auto") -> Dict[str, Any]:
+    """
+
+    Cyclomatic complexity per block, in the `radon cc -j` layout.
+
+    backend works like run_flake8: "auto" uses the in-process radon API and
+
+    falls back to the CLI if radon cannot be imported.
+
+    """
+
+    if backend != "subprocess":
+
+        try:
+
+            return run_radon(file_path, metrics=("radon_cc",))["radon_cc"]
+
+        except ImportError:
+
+            if backend == "inprocess":
+
+                return {"error": "radon not installed."}
+
+    return run_radon_cc_subprocess(file_path)
+
+
+def run_radon_mi(file_path: str, backend: str = "auto") -> Dict[str, Any]:
+    """
+
+    Maintainability index in the `radon mi -j` layout. See run_radon_cc for backend.
+
+    """
+
+    if backend != "subprocess":
+
+        try:
+
+            return run_radon(file_path, metrics=("radon_mi",))["radon_mi"]
+
+        except ImportError:
+
+            if backend == "inprocess":
+
+                return {"error": "radon not installed."}
+
+    return run_radon_mi_subprocess(file_path)
+
+
+def run_radon_cc_subprocess(file_path: str) -> Dict[str, Any]:
     """
 
     Runs radon cc in JSON mode to get cyclomatic complexity per block.
@@ -74,6 +438,8 @@ def run_radon_cc(file_path: str) -> Dict[str, Any]:
 
     try:
 
+        note_subprocess()
+
         proc = subprocess.run(
             ["radon", "cc", "-s", "-j", file_path],
             capture_output=True,
@@ -108,7 +474,7 @@ def run_radon_cc(file_path: str) -> Dict[str, Any]:
         return {"error": str(e)}
 
 
-def run_radon_mi(file_path: str) -> Dict[str, Any]:
+def run_radon_mi_subprocess(file_path: str) -> Dict[str, Any]:
     """
 
     Gets maintainability index from radon mi with JSON output (if supported) otherwise parse text.
@@ -117,6 +483,8 @@ def run_radon_mi(file_path: str) -> Dict[str, Any]:
 
     try:
 
+        note_subprocess()
+
         proc = subprocess.run(
             ["radon", "mi", "-j", file_path],
             capture_output=True,
@@ -149,19 +517,719 @@ def run_radon_mi(file_path: str) -> Dict[str, Any]:
         return {"error": str(e)}
 
 
-def analyze_file(file_path: str) -> Dict[str, Any]:
-    """
+def _flake8_analyzer(file_path: str, source: Optional[str]) -> Dict[str, Any]:
 
-    Combined analysis: flake8 issues + radon complexity + maintainability index
+    return {"flake8_issues": run_flake8(file_path, source=source)}
 
-    """
 
-    report = {}
+def _radon_analyzer(file_path: str, source: Optional[str]) -> Dict[str, Any]:
+
+    try:
+
+        return run_radon(file_path, source)
+
+    except ImportError:
+
+        return {
+            "radon_cc": run_radon_cc_subprocess(file_path),
+            "radon_mi": run_radon_mi_subprocess(file_path),
+        }
+
+
+# name -> (callable, report keys it fills)
+
+ANALYZERS: Dict[str, Tuple[Callable[[str, Optional[str]], Dict[str, Any]], Tuple[str, ...]]] = {
+    "flake8": (_flake8_analyzer, ("flake8_issues",)),
+    "radon": (_radon_analyzer, ("radon_cc", "radon_mi", "radon_raw", "radon_halstead")),
+}
+
+
+def _incremental_flake8_analyzer(file_path: str, source: Optional[str]) -> Dict[str, Any]:
+
+    try:
+
+        from core.incremental import analyze_flake8_incremental
+
+        return analyze_flake8_incremental(file_path, source)
+
+    except ImportError:
+
+        # the block-level path needs flake8 in-process
+
+        return _flake8_analyzer(file_path, source)
+
+
+def _incremental_radon_analyzer(file_path: str, source: Optional[str]) -> Dict[str, Any]:
+
+    try:
+
+        from core.incremental import analyze_radon_incremental
+
+        return analyze_radon_incremental(file_path, source)
+
+    except ImportError:
+
+        return _radon_analyzer(file_path, source)
+
+
+# Used instead of ANALYZERS by analyze_file(..., incremental=True)
+
+INCREMENTAL_ANALYZERS: Dict[str, Tuple[Callable[[str, Optional[str]], Dict[str, Any]], Tuple[str, ...]]] = {
+    "flake8": (_incremental_flake8_analyzer, ANALYZERS["flake8"][1]),
+    "radon": (_incremental_radon_analyzer, ANALYZERS["radon"][1]),
+}
+
+DEFAULT_TIMEOUT = 60.0
+
+# identical analyses running at the same time share one run (see analyze_source)
+
+_IN_FLIGHT = SingleFlight()
+
+# Both analyzers are pure Python, so threads only overlap their I/O: they take
+
+# turns on the GIL. Sources at least this large run each analyzer in a worker
+
+# process of its own instead (see _use_processes)
+
+PROCESS_POOL_MIN_BYTES = 64 * 1024
+
+_process_pools: Dict[str, WarmProcessPool] = {}
+
+_process_pools_lock = threading.Lock()
+
+
+def _analyzer_processes() -> int:
+
+    # AI_CODE_REVIEWER_ANALYZER_PROCESSES workers per analyzer; 0 turns the
+
+    # process pools off. Default: one per concurrent review the app allows
+
+    # (core.pool), so reviews never queue for a worker, if there is more than
+
+    # one CPU to use
+
+    value = os.environ.get("AI_CODE_REVIEWER_ANALYZER_PROCESSES")
+
+    if value is not None:
+
+        return max(int(value), 0)
+
+    return default_workers() if (os.cpu_count() or 1) > 1 else 0
+
+
+def _use_processes(source: Optional[str]) -> bool:
+
+    return (
+        source is not None
+        and len(source) >= PROCESS_POOL_MIN_BYTES
+        and _analyzer_processes() > 0
+    )
+
+
+def _warm_up_process() -> None:
+
+    # runs once in each new worker, so no request pays for the imports and
+
+    # flake8 plugin discovery
+
+    try:
+
+        _flake8_engine()
+
+        analysis_fingerprint()
+
+        import radon.complexity  # noqa: F401
+
+        import radon.metrics  # noqa: F401
+
+        import radon.raw  # noqa: F401
+
+    except Exception:
+
+        # the analyzers report a broken tool themselves
+
+        pass
+
+
+def _process_pool(name: str) -> WarmProcessPool:
+
+    # one long-lived pool per analyzer name: the same workers keep serving it,
+
+    # so their imports and incremental block caches are reused between calls
+
+    with _process_pools_lock:
+
+        pool = _process_pools.get(name)
+
+        if pool is None:
+
+            pool = _process_pools[name] = WarmProcessPool(
+                _analyzer_processes(), initializer=_warm_up_process,
+                name=f"analyzer-{name}",
+            )
+
+        return pool
+
+
+def warm_up_process_pools() -> None:
+    """
+
+    Start the analyzer worker processes now, in the background, instead of on
+
+    the first large analysis. Does nothing when the process pools are off.
+
+    """
+
+    if _analyzer_processes() == 0:
+
+        return
+
+    for name in ANALYZERS:
+
+        # one warm worker each; the rest start when concurrent reviews need them
+
+        _process_pool(name).start(1)
+
+
+def _timed(name: str, fn: Callable, *args: Any) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+
+    # runs in the analyzer's thread or worker process, so the stage measures
+
+    # the CPU of whatever ran the analyzer
+
+    timings: Dict[str, Any] = {}
+
+    with stage(timings, name):
+
+        result = fn(*args)
+
+    return result, timings[name]
+
+
+def _notify(
+    on_result: Optional[Callable[[str, Dict[str, Any]], None]],
+    name: str,
+    result: Dict[str, Any],
+) -> None:
+
+    if on_result is None:
+
+        return
+
+    try:
+
+        on_result(name, result)
+
+    except Exception:
+
+        # a broken listener must not break the analysis
+
+        pass
+
+
+def _error_value(key: str, message: str) -> Any:
+
+    # keep the shape each report key normally has
+
+    return [{"error": message}] if key == "flake8_issues" else {"error": message}
+
+
+def _find_error(value: Any) -> Optional[str]:
+
+    # errors show up as {"error": ...} at the top level or per file / per issue
+
+    if isinstance(value, dict):
+
+        if "error" in value:
+
+            return str(value["error"])
+
+        value = list(value.values())
+
+    if isinstance(value, list):
+
+        for v in value:
+
+            if isinstance(v, dict) and "error" in v:
+
+                return str(v["error"])
+
+    return None
+
+
+@lru_cache(maxsize=None)
+def analysis_fingerprint() -> Dict[str, Any]:
+    """
+
+    Tool versions and effective flake8 config that analysis results depend on.
+
+    Used as part of the cache key so upgrading a tool or changing config
+
+    never serves stale results.
+
+    """
+
+    fingerprint = {"python": list(sys.version_info[:3])}
+
+    try:
+
+        engine = _flake8_engine()
+
+        import flake8
+
+        fingerprint["flake8"] = flake8.__version__ + " " + engine.plugins.versions_str()
+
+        fingerprint["flake8_options"] = json.dumps(
+            vars(engine.options), sort_keys=True, default=repr
+        )
+
+    except Exception:
+
+        fingerprint["flake8"] = None
+
+    try:
+
+        import radon
+
+        fingerprint["radon"] = radon.__version__
+
+    except ImportError:
+
+        fingerprint["radon"] = None
+
+    return fingerprint
+
+
+def path_fingerprint(file_path: str) -> Dict[str, Any]:
+    """
+
+    The parts of the effective flake8 config that depend on the file's path:
+
+    the per-file-ignores pattern that applies to it and whether pyflakes treats
+
+    it as a package __init__.py. Together with analysis_fingerprint() this
+
+    keys results, so the same content under a path with different per-file
+
+    rules is never served another path's issues.
+
+    """
+
+    try:
+
+        per_file = _flake8_engine().guide.style_guide_for(file_path).filename
+
+    except Exception:
+
+        per_file = None
+
+    return {"per_file_ignores": per_file, "package_init": Path(file_path).name == "__init__.py"}
+
+
+def _rekey(report: Dict[str, Any], old_path: str, new_path: str) -> Dict[str, Any]:
+
+    # radon results are keyed by the analyzed path; cached content may come
+
+    # from a different path than the one being asked about now
+
+    if old_path == new_path:
+
+        return report
+
+    for key in ("radon_cc", "radon_mi", "radon_raw", "radon_halstead"):
+
+        value = report.get(key)
+
+        if isinstance(value, dict) and old_path in value:
+
+            value[new_path] = value.pop(old_path)
+
+    return report
+
+
+def _run_analyzers(
+    source: Optional[str],
+    file_path: str,
+    timeout: Optional[float],
+    executor: Optional[Executor],
+    incremental: bool,
+    timings: Dict[str, Any],
+    cache: Optional[ResultCache],
+    cache_key: Optional[str],
+    on_result: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+
+    # the uncached part of analyze_source; returns the same {file_path, report}
+
+    # entry that goes into the cache, which is also what coalesced callers share
+
+    report = {}
+
+    analyzers = INCREMENTAL_ANALYZERS if incremental else ANALYZERS
+
+    own_executor = executor is None
+
+    processes = own_executor and _use_processes(source)
+
+    if own_executor:
+
+        executor = ThreadPoolExecutor(
+            max_workers=len(analyzers), thread_name_prefix="analyzer"
+        )
+
+    started = time.perf_counter()
+
+    futures = {}
+
+    for name, (fn, _) in analyzers.items():
+
+        if processes:
+
+            # each thread waits on one worker process, which enforces the
+
+            # deadline from the moment the job starts, not while it queues
+
+            futures[name] = executor.submit(
+                _process_pool(name).run, _timed, name, fn, file_path, source, timeout=timeout
+            )
+
+        else:
+
+            futures[name] = executor.submit(_timed, name, fn, file_path, source)
+
+    names = {future: name for name, future in futures.items()}
+
+    try:
+
+        # on_result hears about each analyzer as it finishes, in this thread
+
+        for future in as_completed(names, timeout=None if processes else timeout):
+
+            name = names[future]
+
+            try:
+
+                result, _ = future.result()
+
+            except Exception as e:
+
+                message = f"{name} timed out after {timeout}s" if isinstance(e, TimeoutError) else str(e)
+
+                result = {key: _error_value(key, message) for key in analyzers[name][1]}
+
+            _notify(on_result, name, result)
+
+    except FuturesTimeoutError:
+
+        pass
+
+    finally:
+
+        if own_executor:
+
+            # do not block on analyzers that overran the deadline
+
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    statuses = {}
+
+    for name, future in futures.items():
+
+        keys = analyzers[name][1]
+
+        timed_out = not future.done()
+
+        if timed_out:
+
+            future.cancel()
+
+            seconds = round(time.perf_counter() - started, 4)
+
+        elif isinstance(future.exception(), TimeoutError):
+
+            # a worker process overran; the pool has already replaced it
+
+            timed_out, seconds = True, timeout
+
+        if timed_out:
+
+            message = f"{name} timed out after {timeout}s"
+
+            statuses[name] = {"status": "timeout", "seconds": seconds, "error": message}
+
+            for key in keys:
+
+                report[key] = _error_value(key, message)
+
+            continue
+
+        try:
+
+            result, record = future.result()
+
+        except Exception as e:
+
+            statuses[name] = {"status": "error", "seconds": None, "error": str(e)}
+
+            for key in keys:
+
+                report[key] = _error_value(key, str(e))
+
+            continue
+
+        report.update(result)
+
+        timings[name] = record
+
+        errors = [e for e in (_find_error(result.get(key)) for key in keys) if e]
+
+        statuses[name] = {
+            "status": "error" if errors else "ok",
+            "seconds": record["wall"],
+            "error": errors[0] if errors else None,
+        }
+
+    report["analyzers"] = statuses
+
+    report["cached"] = False
+
+    if cache_key is not None and all(v["status"] == "ok" for v in statuses.values()):
+
+        with stage(timings, "cache_store"):
+
+            cache.put(cache_key, {"file_path": file_path, "report": report})
+
+    return {"file_path": file_path, "report": report}
+
+
+def analyze_file(
+    file_path: str,
+    timeout: Optional[float] = DEFAULT_TIMEOUT,
+    executor: Optional[Executor] = None,
+    cache: Optional[ResultCache] = None,
+    incremental: bool = False,
+    profile: Optional[bool] = None,
+    coalesce: bool = True,
+    on_result: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """
+
+    Combined analysis: flake8 issues + radon complexity + maintainability index
+
+    + raw and Halstead metrics. The file is read once and parsed once for radon.
+
+    The analyzers run side by side on executor. By default that is a private
+
+    thread pool, which only overlaps I/O since both analyzers hold the GIL; on
+
+    machines with more than one CPU, sources of PROCESS_POOL_MIN_BYTES or more
+
+    run each analyzer in a shared, pre-warmed worker process instead (see
+
+    warm_up_process_pools; AI_CODE_REVIEWER_ANALYZER_PROCESSES=0 turns this off).
+
+    report["analyzers"] maps each analyzer to {status, seconds, error}; status is
+
+    "ok", "error" or "timeout". timeout is the overall deadline in seconds; in a
+
+    worker process it counts from when the worker picks the job up, and a
+
+    worker that overruns it is killed and replaced.
+
+    With a cache, results are looked up by source hash + analysis_fingerprint()
+
+    + path_fingerprint()
+
+    and report["cached"] says whether they came from it. Only fully successful
+
+    reports are stored.
+
+    incremental=True analyzes block by block and reuses results for top-level
+
+    blocks that did not change since any earlier run in this process (see
+
+    core.incremental); report["flake8_incremental"] and
+
+    report["radon_incremental"] then give {blocks, reused}.
+
+    report["timings"] has a core.instrument record (wall, cpu, peak_rss_kb,
+
+    subprocesses, cache) per stage: read, cache_lookup, each analyzer,
+
+    cache_store, plus "total" for the whole call.
+
+    profile=True (default: AI_CODE_REVIEWER_PROFILE) runs the analysis under
+
+    cProfile and tracemalloc, with the analyzers in this thread, and links the
+
+    dumps from report["profile"] (see core.profiling).
+
+    With coalesce=True, a call made while an identical analysis (same source
+
+    hash, analysis and path fingerprints, incremental flag and timeout) is running in
+
+    this process waits for that run and gets a copy of its result instead of
+
+    starting another; report["coalesced"] says whether that happened and
+
+    timings["coalesced_wait"] how long it waited. Profiled runs never coalesce.
+
+    on_result(name, result) is called from the calling thread as each
+
+    analyzer finishes, with the report keys it produced, so callers can show
+
+    partial results early. Cached and coalesced results arrive only as the
+
+    returned report.
+
+    """
+
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+
+    timings: Dict[str, Any] = {}
+
+    with stage(timings, "read"):
+
+        try:
+
+            source = Path(file_path).read_text(encoding="utf-8")
+
+        except Exception:
+
+            # analyzers report the unreadable file themselves
+
+            source = None
+
+    return analyze_source(
+        source, file_path, timeout, executor, cache, incremental,
+        timings=timings, started=(wall_start, cpu_start), profile=profile, coalesce=coalesce,
+        on_result=on_result,
+    )
+
+
+def analyze_source(
+    source: Optional[str],
+    file_path: str = "stdin",
+    timeout: Optional[float] = DEFAULT_TIMEOUT,
+    executor: Optional[Executor] = None,
+    cache: Optional[ResultCache] = None,
+    incremental: bool = False,
+    timings: Optional[Dict[str, Any]] = None,
+    started: Optional[Tuple[float, float]] = None,
+    profile: Optional[bool] = None,
+    coalesce: bool = True,
+    on_result: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """
+
+    Same as analyze_file but for source text that is already in memory
+
+    (stdin, an editor buffer). file_path is only used to label results.
+
+    timings and started let analyze_file add its read stage to the report.
+
+    """
+
+    if profile is None:
+
+        profile = profiling_enabled()
+
+    if profile:
+
+        with profile_run(Path(file_path).stem + "-analysis") as info:
+
+            report = analyze_source(
+                source, file_path, timeout, executor or InlineExecutor(), cache, incremental,
+                timings=timings, started=started, profile=False, coalesce=False,
+                on_result=on_result,
+            )
+
+        report["profile"] = info
+
+        return report
+
+    wall_start, cpu_start = started or (time.perf_counter(), time.process_time())
+
+    timings = {} if timings is None else timings
+
+    cache_key = None
+
+    if cache is not None and source is not None:
+
+        with stage(timings, "cache_lookup") as record:
+
+            cache_key = make_key(
+                "analysis", source_hash(source), {**analysis_fingerprint(), **path_fingerprint(file_path)}
+            )
+
+            hit = cache.get(cache_key)
+
+            record["cache"] = "miss" if hit is None else "hit"
+
+        if hit is not None:
+
+            report = _rekey(hit["report"], hit["file_path"], file_path)
+
+            report["cached"] = True
+
+            report["coalesced"] = False
+
+            timings["total"] = total_record(timings, wall_start, cpu_start)
+
+            report["timings"] = timings
+
+            observe_analysis(report, len(source.encode("utf-8")))
+
+            return report
+
+    if coalesce and source is not None:
+
+        flight_key = make_key(
+            "analysis",
+            source_hash(source),
+            {
+                **analysis_fingerprint(),
+                **path_fingerprint(file_path),
+                "incremental": incremental,
+                "timeout": timeout,
+            },
+        )
+
+        waited = time.perf_counter()
+
+        entry, coalesced = _IN_FLIGHT.do(
+            flight_key, _run_analyzers,
+            source, file_path, timeout, executor, incremental, timings, cache, cache_key,
+            on_result,
+        )
+
+    else:
+
+        entry, coalesced = _run_analyzers(
+            source, file_path, timeout, executor, incremental, timings, cache, cache_key,
+            on_result,
+        ), False
+
+    if coalesced:
+
+        # the leader's report is shared; take a private copy before relabeling it
+
+        report = _rekey(copy.deepcopy(entry["report"]), entry["file_path"], file_path)
+
+        timings["coalesced_wait"] = {"wall": round(time.perf_counter() - waited, 4)}
+
+    else:
+
+        # only top-level keys change below, so a shallow copy keeps waiters' deep copies safe
+
+        report = dict(entry["report"])
+
+    report["coalesced"] = coalesced
 
-    report["flake8_issues"] = run_flake8(file_path)
+    timings["total"] = total_record(timings, wall_start, cpu_start)
 
-    report["radon_cc"] = run_radon_cc(file_path)
+    report["timings"] = timings
 
-    report["radon_mi"] = run_radon_mi(file_path)
+    observe_analysis(report, len(source.encode("utf-8")) if source is not None else None)
 
     return report
\ No newline at end of file
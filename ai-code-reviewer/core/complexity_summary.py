@@ -0,0 +1,81 @@
+# core/complexity_summary.py
+"""
+Chart-ready summary of radon cyclomatic complexity.
+
+Small results are shown block by block. Past DETAIL_LIMIT blocks a bar per
+block is unreadable and slow to draw, so summarize() switches to the TOP_N
+most complex blocks plus a histogram of the whole distribution. Either way
+the result has a bounded size, whatever the number of blocks, and can be
+handed to a client-side chart as is.
+"""
+import heapq
+import math
+from typing import Any, Dict, List
+
+DETAIL_LIMIT = 60
+TOP_N = 25
+MAX_BINS = 30
+
+
+def block_rows(radon_cc: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    One row per block (function, method, class) of a radon_cc report.
+    """
+    rows = []
+    for fname, blocks in radon_cc.items():
+        if not isinstance(blocks, list):
+            continue
+        for b in blocks:
+            rows.append({
+                "file": fname,
+                "name": b.get("name"),
+                "type": b.get("type"),
+                "complexity": b.get("complexity") or 0,
+                "lineno": b.get("lineno"),
+                "rank": b.get("rank"),
+            })
+    return rows
+
+
+def histogram(values: List[int], max_bins: int = MAX_BINS) -> List[Dict[str, Any]]:
+    """
+    Integer-aligned bins [start, end) covering values, at most max_bins.
+    """
+    if not values:
+        return []
+    low, high = min(values), max(values)
+    width = max(1, math.ceil((high - low + 1) / max_bins))
+    counts = [0] * ((high - low) // width + 1)
+    for value in values:
+        counts[(value - low) // width] += 1
+    return [
+        {"start": low + i * width, "end": low + (i + 1) * width, "count": count}
+        for i, count in enumerate(counts)
+    ]
+
+
+def summarize(radon_cc: Dict[str, Any], detail_limit: int = DETAIL_LIMIT, top_n: int = TOP_N) -> Dict[str, Any]:
+    """
+    {mode, blocks, mean, max, ranks, rows, histogram}. mode is "detail"
+    (rows holds every block, sorted back into source order since radon_cc
+    lists the most complex first) or "top" (rows holds the top_n most
+    complex blocks, worst first).
+    """
+    rows = block_rows(radon_cc)
+    values = [r["complexity"] for r in rows]
+    ranks: Dict[str, int] = {}
+    for r in rows:
+        ranks[r["rank"]] = ranks.get(r["rank"], 0) + 1
+    detail = len(rows) <= detail_limit
+    return {
+        "mode": "detail" if detail else "top",
+        "blocks": len(rows),
+        "mean": round(sum(values) / len(values), 2) if values else None,
+        "max": max(values) if values else None,
+        "ranks": dict(sorted(ranks.items(), key=lambda item: str(item[0]))),
+        "rows": (
+            sorted(rows, key=lambda r: (r["file"], r["lineno"] or 0)) if detail
+            else heapq.nlargest(top_n, rows, key=lambda r: r["complexity"])
+        ),
+        "histogram": histogram(values),
+    }
@@ -0,0 +1,248 @@
+# core/corpus.py
+"""
+Deterministic synthetic Python corpus for scale testing.
+
+    python -m core.corpus OUT_DIR --seed 1 --files 200 --lines 800
+
+writes a package tree of generated modules (plus corpus.json describing it)
+that the benchmark suite and batch mode can run on. The same arguments always
+produce byte-identical files. Knobs:
+
+  * lines / functions: module size and how many functions it is split into
+  * max_depth: how deeply branches nest
+  * mean_complexity: mean cyclomatic complexity per function; the
+    distribution is exponential, so a few functions are much worse
+  * violation_density: fraction of lines given a flake8 style violation
+  * pathological: fraction of files with one huge, deeply nested function
+    and long lines, like the uploads that hurt in production
+"""
+import argparse
+import json
+import random
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+MAX_COMPLEXITY = 200
+LINE_LIMIT = 79
+
+
+def _branches(rng: random.Random, budget: int, depth: int, max_depth: int, indent: int) -> List[str]:
+    """
+    Statements that add exactly `budget` to cyclomatic complexity.
+    """
+    pad = " " * indent
+    out: List[str] = []
+    while budget > 0:
+        kind = rng.choice(("if", "for", "while", "try", "ifexp"))
+        budget -= 1
+        n = rng.randrange(100)
+        if kind == "ifexp":
+            out.append(f"{pad}value = a if b > {n} else value")
+            continue
+        inner = 0
+        if depth < max_depth and budget > 0 and rng.random() < 0.6:
+            inner = rng.randint(1, budget)
+            budget -= inner
+        body = _branches(rng, inner, depth + 1, max_depth, indent + 4)
+        body = body or [f"{pad}    value += {n}"]
+        if kind == "if":
+            out += [f"{pad}if a > {n}:"] + body + [f"{pad}else:", f"{pad}    value -= 1"]
+        elif kind == "for":
+            out += [f"{pad}for item in items:"] + body
+        elif kind == "while":
+            out += [f"{pad}while value < {n}:"] + body + [f"{pad}    value += 1"]
+        else:
+            out += [f"{pad}try:"] + body + [f"{pad}except ValueError:", f"{pad}    value = 0"]
+    return out
+
+
+def _function(
+    rng: random.Random, name: str, complexity: int, max_depth: int, size: int, method: bool
+) -> List[str]:
+    indent = 4 if method else 0
+    pad = " " * indent
+    args = "self, a, b, items" if method else "a, b, items"
+    body = [f"{pad}    value = 0"]
+    body += _branches(rng, complexity - 1, 1, max_depth, indent + 4)
+    # straight-line filler up to the requested size
+    filler = size - len(body) - 2
+    body += [f"{pad}    value += a * {k} - b" for k in range(max(filler, 0))]
+    return [f"{pad}def {name}({args}):"] + body + [f"{pad}    return value"]
+
+
+def _complexity(rng: random.Random, mean: float) -> int:
+    if mean <= 1:
+        return 1
+    return min(1 + int(rng.expovariate(1.0 / (mean - 1))), MAX_COMPLEXITY)
+
+
+def _violate(rng: random.Random, line: str) -> str:
+    # in-place edits only, so the module keeps its line count and still parses
+    choices = ["W291", "E501", "E261"]
+    if " = " in line:
+        choices.append("E225")
+    if ", " in line:
+        choices.append("E231")
+    code = rng.choice(choices) if line.strip() else "W293"
+    if code == "W293":
+        return "    "
+    if code == "W291":
+        return line + "  "
+    if code == "E501":
+        return line + "  # " + "x" * max(LINE_LIMIT - len(line), 10)
+    if code == "E261":
+        return line + " # note"
+    if code == "E225":
+        return line.replace(" = ", "=", 1)
+    return line.replace(", ", ",", 1)
+
+
+def generate_module(
+    rng: random.Random,
+    lines: int,
+    functions: Optional[int] = None,
+    max_depth: int = 4,
+    mean_complexity: float = 4.0,
+    violation_density: float = 0.0,
+    class_ratio: float = 0.3,
+) -> str:
+    """
+    One module of about `lines` lines (exactly, unless the functions' branches
+    alone need more). Everything random comes from rng.
+    """
+    header = ['"""Generated module."""']
+    if violation_density > 0:
+        header.append("import json")  # F401
+    functions = functions or max(1, lines // 30)
+    out = list(header)
+    index = 0
+    while index < functions:
+        # spread the remaining lines over the remaining functions, so one
+        # function that outgrew its share is made up for by the next ones
+        per_function = max((lines - len(out)) // (functions - index) - 2, 3)
+        methods = rng.randint(1, 4) if rng.random() < class_ratio else 0
+        if methods:
+            out += ["", "", f"class Generated{index}:"]
+            for m in range(min(methods, functions - index)):
+                if m:
+                    out.append("")
+                out += _function(
+                    rng, f"method_{index}", _complexity(rng, mean_complexity), max_depth,
+                    per_function - 1, method=True,
+                )
+                index += 1
+        else:
+            out += ["", ""] + _function(
+                rng, f"func_{index}", _complexity(rng, mean_complexity), max_depth,
+                per_function, method=False,
+            )
+            index += 1
+    padding = lines - len(out)
+    if padding > 2:
+        out += ["", ""] + [f"CONSTANT_{k} = {k} * 2" for k in range(padding - 2)]
+    else:
+        out += ["# generated"] * max(padding, 0)
+    if violation_density > 0:
+        out = [_violate(rng, line) if rng.random() < violation_density else line for line in out]
+    return "\n".join(out) + "\n"
+
+
+def generate_corpus(
+    out_dir: str,
+    seed: int = 0,
+    files: int = 10,
+    lines: int = 500,
+    functions: Optional[int] = None,
+    max_depth: int = 4,
+    mean_complexity: float = 4.0,
+    violation_density: float = 0.02,
+    package_depth: int = 2,
+    pathological: float = 0.0,
+) -> List[str]:
+    """
+    Write `files` modules under out_dir in packages up to package_depth deep,
+    plus corpus.json with the parameters and per-file details. Returns the
+    module paths. Each file has its own seed derived from `seed`, so changing
+    `files` does not change the files that were already there.
+    """
+    root = Path(out_dir)
+    root.mkdir(parents=True, exist_ok=True)
+    params = {
+        "seed": seed, "files": files, "lines": lines, "functions": functions,
+        "max_depth": max_depth, "mean_complexity": mean_complexity,
+        "violation_density": violation_density, "package_depth": package_depth,
+        "pathological": pathological,
+    }
+    paths = []
+    entries: List[Dict[str, Any]] = []
+    for i in range(files):
+        rng = random.Random(f"{seed}:{i}")
+        parts = [f"pkg_{rng.randrange(3)}" for _ in range(rng.randint(0, package_depth))]
+        directory = root
+        for part in parts:
+            directory = directory / part
+            directory.mkdir(exist_ok=True)
+            (directory / "__init__.py").touch()
+        is_pathological = rng.random() < pathological
+        if is_pathological:
+            source = generate_module(
+                rng, lines, functions=1, max_depth=max_depth + 4,
+                mean_complexity=mean_complexity * 20, violation_density=max(violation_density, 0.2),
+            )
+        else:
+            source = generate_module(
+                rng, lines, functions, max_depth, mean_complexity, violation_density
+            )
+        path = directory / f"module_{i:04d}.py"
+        path.write_text(source, encoding="utf-8")
+        paths.append(str(path))
+        entries.append({
+            "path": str(path.relative_to(root)),
+            "lines": source.count("\n"),
+            "pathological": is_pathological,
+        })
+    (root / "corpus.json").write_text(
+        json.dumps({"params": params, "files": entries}, indent=2), encoding="utf-8"
+    )
+    return paths
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m core.corpus", description="Generate a synthetic Python corpus."
+    )
+    parser.add_argument(
+        "out_dir", nargs="?",
+        help="where to write it (default: a scratch directory in the temp dir)",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--files", type=int, default=10)
+    parser.add_argument("--lines", type=int, default=500, help="lines per module")
+    parser.add_argument("--functions", type=int, help="functions per module (default: lines/30)")
+    parser.add_argument("--max-depth", type=int, default=4, help="deepest branch nesting")
+    parser.add_argument("--mean-complexity", type=float, default=4.0)
+    parser.add_argument(
+        "--violation-density", type=float, default=0.02,
+        help="fraction of lines with a style violation",
+    )
+    parser.add_argument("--package-depth", type=int, default=2)
+    parser.add_argument(
+        "--pathological", type=float, default=0.0,
+        help="fraction of files with one huge, deeply nested function",
+    )
+    args = parser.parse_args(argv)
+    out_dir = args.out_dir or str(
+        Path(tempfile.gettempdir()) / f"ai-code-reviewer-corpus-{args.seed}"
+    )
+    paths = generate_corpus(
+        out_dir, args.seed, args.files, args.lines, args.functions, args.max_depth,
+        args.mean_complexity, args.violation_density, args.package_depth, args.pathological,
+    )
+    print(f"wrote {len(paths)} modules to {out_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
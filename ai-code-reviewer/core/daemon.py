@@ -0,0 +1,305 @@
+# core/daemon.py
+"""
+Long-lived local analysis worker.
+
+The daemon imports flake8, radon and black and loads their plugins and config
+once, then serves requests from any number of clients over a Unix socket. It
+exits by itself after idle_timeout seconds without requests.
+
+Protocol: one JSON object per line in each direction.
+  {"op": "analyze", "source": "...", "file": "name.py"} -> analyze_source report
+  {"op": "format", "source": "...", "file": "name.py"}  -> {"formatted", "changed"}
+  {"op": "ping"} / {"op": "shutdown"}                   -> {"ok": true}
+Errors come back as {"error": "..."}.
+
+Run it with: python -m core.daemon [--socket PATH] [--idle-timeout SECONDS]
+"""
+import argparse
+import json
+import os
+import socket
+import socketserver
+import stat
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from core.cache import default_cache
+from core.code_analysis import DEFAULT_TIMEOUT, _flake8_engine, analyze_source
+from core.metrics import WORKERS_BUSY, start_exporters_from_env
+
+DEFAULT_IDLE_TIMEOUT = 15 * 60.0
+
+
+# how much longer than the analysis timeout a client waits for the daemon
+CLIENT_GRACE = 10.0
+
+
+def default_socket_path() -> str:
+    """
+    AI_CODE_REVIEWER_SOCKET, or a socket in $XDG_RUNTIME_DIR, or one in a
+    per-user 0700 directory under the temp directory.
+    """
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        default = os.path.join(runtime_dir, "ai-code-reviewer.sock")
+    else:
+        default = os.path.join(
+            tempfile.gettempdir(), f"ai-code-reviewer-{os.getuid()}", "daemon.sock"
+        )
+    return os.environ.get("AI_CODE_REVIEWER_SOCKET", default)
+
+
+def _check_socket_dir(socket_path: str) -> None:
+    # the directory must be ours (or sticky, like /tmp), or someone else could
+    # swap the socket for their own
+    directory = os.path.dirname(os.path.abspath(socket_path))
+    if not os.path.isdir(directory):
+        os.makedirs(directory, mode=0o700)
+    st = os.stat(directory)
+    if st.st_uid != os.getuid() and not st.st_mode & stat.S_ISVTX:
+        raise PermissionError(f"{directory} is not owned by the current user")
+
+
+def _check_socket_owner(socket_path: str) -> None:
+    # never send source code to a socket another user created
+    if os.stat(socket_path).st_uid != os.getuid():
+        raise PermissionError(f"{socket_path} is not owned by the current user")
+
+
+def _warm_up() -> None:
+    # pay the import and plugin discovery cost once, before the first client
+    _flake8_engine()
+    import radon.complexity  # noqa: F401
+    import radon.metrics  # noqa: F401
+    import radon.raw  # noqa: F401
+    try:
+        import black  # noqa: F401
+    except ImportError:
+        pass
+
+
+def _handle(request: Dict[str, Any], server: "AnalysisDaemon") -> Dict[str, Any]:
+    op = request.get("op")
+    if op == "ping":
+        return {"ok": True, "pid": os.getpid()}
+    if op == "shutdown":
+        threading.Thread(target=server.shutdown, daemon=True).start()
+        return {"ok": True}
+    if op not in ("analyze", "format"):
+        return {"error": f"unknown op: {op!r}"}
+    source = request.get("source")
+    file_path = request.get("file") or "stdin"
+    if not isinstance(source, str):
+        return {"error": "request needs a 'source' string"}
+    if op == "analyze":
+        cache = default_cache() if request.get("cache", True) else None
+        return analyze_source(
+            source, file_path, request.get("timeout", DEFAULT_TIMEOUT), cache=cache
+        )
+    from core.formatter import black_mode, format_source
+    formatted, changed = format_source(source, black_mode(file_path))
+    return {"formatted": formatted, "changed": changed}
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        server: AnalysisDaemon = self.server  # type: ignore[assignment]
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            server.begin_request()
+            try:
+                response = _handle(json.loads(line), server)
+            except Exception as e:
+                response = {"error": str(e)}
+            finally:
+                server.end_request()
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class AnalysisDaemon(socketserver.ThreadingUnixStreamServer):
+    """
+    Threaded Unix socket server; each client connection gets its own thread
+    and may send several requests.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, idle_timeout: float = DEFAULT_IDLE_TIMEOUT):
+        self.socket_path = socket_path
+        self.idle_timeout = idle_timeout
+        self._active = 0
+        self._last_activity = time.monotonic()
+        self._activity_lock = threading.Lock()
+        _check_socket_dir(socket_path)
+        if os.path.exists(socket_path):
+            if _ping(socket_path):
+                raise OSError(f"an analysis daemon is already serving {socket_path}")
+            # stale socket from a daemon that did not shut down cleanly
+            os.unlink(socket_path)
+        # created 0600 from the start, not chmod-ed after bind
+        umask = os.umask(0o077)
+        try:
+            super().__init__(socket_path, _RequestHandler)
+        finally:
+            os.umask(umask)
+
+    def begin_request(self) -> None:
+        with self._activity_lock:
+            self._active += 1
+            WORKERS_BUSY.set(self._active, pool="daemon")
+
+    def end_request(self) -> None:
+        with self._activity_lock:
+            self._active -= 1
+            self._last_activity = time.monotonic()
+            WORKERS_BUSY.set(self._active, pool="daemon")
+
+    def _idle_watchdog(self) -> None:
+        while True:
+            time.sleep(min(1.0, self.idle_timeout))
+            with self._activity_lock:
+                idle = self._active == 0 and (
+                    time.monotonic() - self._last_activity >= self.idle_timeout
+                )
+            if idle:
+                self.shutdown()
+                return
+
+    def serve(self) -> None:
+        if self.idle_timeout > 0:
+            threading.Thread(target=self._idle_watchdog, daemon=True).start()
+        try:
+            self.serve_forever()
+        finally:
+            self.server_close()
+            try:
+                os.unlink(self.socket_path)
+            except FileNotFoundError:
+                pass
+
+
+class DaemonClient:
+    """
+    Connection to a running daemon. Not thread-safe; use one per thread.
+    """
+
+    def __init__(self, socket_path: Optional[str] = None, timeout: Optional[float] = None):
+        self.socket_path = socket_path or default_socket_path()
+        _check_socket_owner(self.socket_path)
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        self._sock.connect(self.socket_path)
+        self._file = self._sock.makefile("rwb")
+
+    def request(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        self._file.write(json.dumps(payload).encode("utf-8") + b"\n")
+        self._file.flush()
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("analysis daemon closed the connection")
+        return json.loads(line)
+
+    def analyze(self, source: str, file_path: str = "stdin", **options: Any) -> Dict[str, Any]:
+        return self.request({"op": "analyze", "source": source, "file": file_path, **options})
+
+    def format(self, source: str, file_path: str = "stdin") -> Dict[str, Any]:
+        return self.request({"op": "format", "source": source, "file": file_path})
+
+    def close(self) -> None:
+        self._file.close()
+        self._sock.close()
+
+    def __enter__(self) -> "DaemonClient":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def start_daemon(
+    socket_path: Optional[str] = None,
+    idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+    wait: float = 10.0,
+) -> bool:
+    """
+    Start a detached daemon unless one already answers on socket_path, and
+    wait up to `wait` seconds for it to accept connections.
+    """
+    socket_path = socket_path or default_socket_path()
+    if _ping(socket_path):
+        return True
+    subprocess.Popen(
+        [sys.executable, "-m", "core.daemon", "--socket", socket_path,
+         "--idle-timeout", str(idle_timeout)],
+        cwd=str(Path(__file__).parent.parent),
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        if _ping(socket_path):
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def _ping(socket_path: str) -> bool:
+    try:
+        with DaemonClient(socket_path, timeout=2.0) as client:
+            return bool(client.request({"op": "ping"}).get("ok"))
+    except (OSError, ValueError):
+        return False
+
+
+def analyze_source_via_daemon(
+    source: str,
+    file_path: str = "stdin",
+    socket_path: Optional[str] = None,
+    autostart: bool = True,
+    timeout: Optional[float] = DEFAULT_TIMEOUT,
+    cache: bool = True,
+) -> Dict[str, Any]:
+    """
+    Analyze through the daemon, starting it if needed. Falls back to
+    in-process analysis if the daemon cannot be reached. timeout and cache
+    (whether to use the default result cache) apply either way.
+    """
+    socket_path = socket_path or default_socket_path()
+    if not autostart or start_daemon(socket_path):
+        try:
+            # a hung daemon must not hang the caller
+            wait = timeout + CLIENT_GRACE if timeout is not None else None
+            with DaemonClient(socket_path, timeout=wait) as client:
+                report = client.analyze(source, file_path, timeout=timeout, cache=cache)
+            if "flake8_issues" in report:
+                return report
+        except (OSError, ValueError):
+            pass
+    return analyze_source(source, file_path, timeout, cache=default_cache() if cache else None)
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m core.daemon")
+    parser.add_argument("--socket", default=default_socket_path())
+    parser.add_argument(
+        "--idle-timeout", type=float, default=DEFAULT_IDLE_TIMEOUT,
+        help="exit after this many idle seconds (0 = never)",
+    )
+    args = parser.parse_args(argv)
+    start_exporters_from_env()
+    _warm_up()
+    AnalysisDaemon(args.socket, args.idle_timeout).serve()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,20 @@
 # core/formatter.py
 import subprocess
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
-from typing import Tuple
+from typing import Any, Dict, Optional, Tuple
+
+from core.cache import ResultCache, make_key, source_hash
+from core.instrument import note_subprocess, stage
+from core.metrics import observe_format
+
+FORMAT_MEMO_SIZE = 128
+
+_format_memo: "OrderedDict[Tuple[str, str], Tuple[str, bool]]" = OrderedDict()
+_format_memo_lock = threading.Lock()
 
 def run_black(file_path: str) -> Tuple[bool, str]:
     """
@@ -10,6 +23,7 @@ def run_black(file_path: str) -> Tuple[bool, str]:
     """
     try:
         # --quiet to minimize output, --fast to skip safety checks for speed
+        note_subprocess()
         res = subprocess.run(
             ["black", "--quiet", "--fast", file_path],
             capture_output=True,
@@ -24,17 +38,188 @@ def run_black(file_path: str) -> Tuple[bool, str]:
     except Exception as e:
         return False, str(e)
 
-def get_formatted_copy(src_path: str, dest_path: str) -> Tuple[bool, str]:
+def format_source(text: str, mode: Any = None) -> Tuple[str, bool]:
+    """
+    Format Python source text with black's string API (equivalent to --fast,
+    no file is touched). Returns (formatted_text, changed).
+    Results are memoized by content hash and black mode.
+    Raises ImportError if black is missing and black.InvalidInput on bad syntax.
+    """
+    import black
+    if mode is None:
+        mode = black.Mode()
+    key = (source_hash(text), mode.get_cache_key())
+    with _format_memo_lock:
+        if key in _format_memo:
+            _format_memo.move_to_end(key)
+            return _format_memo[key]
+    formatted = black.format_str(text, mode=mode)
+    result = (formatted, formatted != text)
+    with _format_memo_lock:
+        _format_memo[key] = result
+        while len(_format_memo) > FORMAT_MEMO_SIZE:
+            _format_memo.popitem(last=False)
+    return result
+
+def _find_pyproject(src_path: Optional[str]) -> Optional[Path]:
+    if src_path is None:
+        return None
+    for parent in Path(src_path).resolve().parents:
+        candidate = parent / "pyproject.toml"
+        if candidate.is_file():
+            return candidate
+    return None
+
+@lru_cache(maxsize=32)
+def _mode_from_pyproject(path: Optional[str], mtime: float) -> Any:
+    import black
+    config = black.parse_pyproject_toml(path) if path else {}
+    kwargs = {}
+    if "line_length" in config:
+        kwargs["line_length"] = int(config["line_length"])
+    if config.get("skip_string_normalization"):
+        kwargs["string_normalization"] = False
+    if config.get("skip_magic_trailing_comma"):
+        kwargs["magic_trailing_comma"] = False
+    if config.get("preview"):
+        kwargs["preview"] = True
+    if config.get("target_version"):
+        kwargs["target_versions"] = {
+            black.TargetVersion[v.upper()] for v in config["target_version"]
+        }
+    return black.Mode(**kwargs)
+
+def black_mode(src_path: Optional[str]) -> Any:
+    """
+    black.Mode for src_path, honouring [tool.black] in the nearest pyproject.toml
+    the same way the black CLI would.
+    """
+    pyproject = _find_pyproject(src_path)
+    if pyproject is None:
+        return _mode_from_pyproject(None, 0.0)
+    return _mode_from_pyproject(str(pyproject), pyproject.stat().st_mtime)
+
+@lru_cache(maxsize=None)
+def _black_version() -> Optional[str]:
+    try:
+        import black
+        return black.__version__
+    except ImportError:
+        return None
+
+def format_fingerprint(src_path: Optional[str]) -> Dict[str, Any]:
+    """
+    Black version, black mode and the nearest pyproject.toml (where black
+    reads its config from), for use in cache keys.
+    """
+    pyproject = _find_pyproject(src_path)
+    config = source_hash(pyproject.read_text(encoding="utf-8")) if pyproject else None
+    try:
+        mode = black_mode(src_path).get_cache_key()
+    except ImportError:
+        mode = "cli --fast"
+    return {"black": _black_version(), "pyproject": config, "mode": mode}
+
+def _formatted_message(dest_path: str, changed: bool) -> str:
+    if changed:
+        return "Formatted file written to " + dest_path
+    return "Already formatted; copied to " + dest_path
+
+def get_formatted_copy(
+    src_path: str,
+    dest_path: str,
+    cache: Optional[ResultCache] = None,
+    timings: Optional[Dict[str, Any]] = None,
+) -> Tuple[bool, str]:
+    """
+    Format src_path with black and write the result to dest_path.
+    src_path is never modified. Returns (success, message)
+    With a cache, black is skipped when this exact source was formatted before.
+    Pass a dict as timings to get core.instrument records for the read,
+    cache_lookup, black, write and cache_store stages.
+    """
+    timings = {} if timings is None else timings
+    started = time.perf_counter()
+    success, message = _get_formatted_copy(src_path, dest_path, cache, timings)
+    observe_format(success, time.perf_counter() - started, timings)
+    return success, message
+
+def get_formatted_source(
+    text: str,
+    src_path: Optional[str] = None,
+    cache: Optional[ResultCache] = None,
+    timings: Optional[Dict[str, Any]] = None,
+) -> Tuple[bool, str, Optional[str]]:
     """
-    Format src_path with black and copy result to dest_path.
-    Returns (success, message)
+    Format source text in memory; nothing is read or written. src_path only
+    selects the pyproject.toml black takes its config from (none by default).
+    Returns (success, message, formatted_text), formatted_text None on failure.
+    cache and timings work as for get_formatted_copy, without read and write.
     """
-    success, out = run_black(src_path)
-    if not success and "not found" in out.lower():
-        return False, out
+    timings = {} if timings is None else timings
+    started = time.perf_counter()
+    formatted, error = _format_text(text, src_path, cache, timings)
+    observe_format(formatted is not None, time.perf_counter() - started, timings)
+    if formatted is None:
+        return False, error, None
+    return True, "Formatted" if formatted != text else "Already formatted", formatted
+
+def _get_formatted_copy(
+    src_path: str, dest_path: str, cache: Optional[ResultCache], timings: Dict[str, Any]
+) -> Tuple[bool, str]:
+    try:
+        with stage(timings, "read"):
+            original = Path(src_path).read_text(encoding="utf-8")
+    except Exception as e:
+        return False, str(e)
+    formatted, error = _format_text(original, src_path, cache, timings)
+    if formatted is None:
+        return False, error
     try:
-        content = Path(src_path).read_text(encoding="utf-8")
-        Path(dest_path).write_text(content, encoding="utf-8")
-        return True, "Formatted file written to " + dest_path
+        with stage(timings, "write"):
+            Path(dest_path).write_text(formatted, encoding="utf-8")
     except Exception as e:
         return False, str(e)
+    return True, _formatted_message(dest_path, formatted != original)
+
+def _format_text(
+    original: str, src_path: Optional[str], cache: Optional[ResultCache], timings: Dict[str, Any]
+) -> Tuple[Optional[str], str]:
+    # (formatted_text, "") or (None, error message)
+    cache_key = None
+    if cache is not None:
+        with stage(timings, "cache_lookup") as record:
+            cache_key = make_key("format", source_hash(original), format_fingerprint(src_path))
+            hit = cache.get(cache_key)
+            record["cache"] = "miss" if hit is None else "hit"
+        if hit is not None:
+            return hit["formatted"], ""
+    try:
+        with stage(timings, "black"):
+            formatted, _ = format_source(original, black_mode(src_path))
+    except ImportError:
+        with stage(timings, "black"):
+            return _format_text_with_cli(original, src_path)
+    except Exception as e:
+        # black.InvalidInput for code it cannot parse
+        return None, f"black could not format the file: {e}"
+    if cache_key is not None:
+        with stage(timings, "cache_store"):
+            cache.put(cache_key, {"formatted": formatted})
+    return formatted, ""
+
+def _format_text_with_cli(original: str, src_path: Optional[str]) -> Tuple[Optional[str], str]:
+    # black is not importable here; pipe the text through the CLI
+    command = ["black", "--quiet", "--fast", "-"]
+    if src_path is not None:
+        command[-1:] = ["--stdin-filename", src_path, "-"]
+    try:
+        note_subprocess()
+        res = subprocess.run(command, input=original, capture_output=True, text=True, check=False)
+    except FileNotFoundError as e:
+        return None, f"black not found: {e}"
+    except Exception as e:
+        return None, str(e)
+    if res.returncode != 0:
+        return None, res.stderr.strip() or "black failed"
+    return res.stdout, ""
@@ -0,0 +1,751 @@
+# core/incremental.py
+"""
+Block-level incremental analysis.
+
+The module is split into top-level blocks (each top-level statement together
+with the blank and comment lines before it). Each block is hashed and its
+block-local results are kept in an in-process LRU keyed by that hash, with
+line numbers stored relative to the block start:
+
+  * radon cyclomatic complexity, Halstead counts and raw metrics
+  * flake8 checks that only look at nearby code: pycodestyle (E/W), mccabe (C90)
+
+Unchanged blocks reuse those results, shifted to their new position, so an
+edit to one function only re-analyzes that function. flake8 and radon are
+separate analyzers with their own block entries, so each reports as soon as
+it is done. Both share one parse of the source and its block split. MI is
+recomputed from the merged totals.
+
+Checks that need the whole module run on the whole tree every time: unknown
+AST plugins as they are, pyflakes on a copy in which the bodies of unchanged
+top-level functions and methods are replaced by a stub that reads the same
+module names. Module-level findings (unused imports, redefinitions) still see
+those reads, and the stubbed bodies' own findings come from the block cache.
+A body is only stubbed when its findings cannot depend on the rest of the
+module beyond which of the names it reads are bound there; see
+_function_scopes and _stub_status.
+"""
+import ast
+import copy
+import hashlib
+import re
+import symtable
+import threading
+from collections import OrderedDict
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from core.code_analysis import (
+    _flake8_analyzer,
+    _flake8_engine,
+    _radon_analyzer,
+    analysis_fingerprint,
+    path_fingerprint,
+)
+from core.cache import source_hash
+from core.singleflight import SingleFlight
+
+BLOCK_CACHE_SIZE = 8192
+# parsed sources kept so the flake8 and radon analyzers share one parse
+PARSE_MEMO_SIZE = 4
+
+# AST plugins whose findings stay inside one function or class
+LOCAL_TREE_PLUGINS = {"C90", "R70"}
+
+# keywords pycodestyle allows among the imports at the top (E402)
+_E402_KEYWORDS = ("try", "except", "else", "finally", "with", "if", "elif")
+
+_block_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_block_cache_lock = threading.Lock()
+_parse_memo: "OrderedDict[str, Any]" = OrderedDict()
+_parse_lock = threading.Lock()
+_parse_flight = SingleFlight()
+
+# calls whose string arguments pyflakes parses as annotations
+_STRING_ANNOTATION_CALLS = {"cast", "TypeVar", "NewType", "NamedTuple", "TypedDict"}
+
+
+def split_blocks(lines: List[str], tree: ast.Module) -> List[Tuple[int, int, List[ast.stmt]]]:
+    """
+    Return (start, end, statements) per top-level block, with 0-based [start,
+    end) line ranges covering every line. Statements sharing a line are kept
+    in one block; trailing lines after the last statement go to the last block.
+    """
+    blocks: List[Tuple[int, int, List[ast.stmt]]] = []
+    start = 0
+    for node in tree.body:
+        first = min([node.lineno] + [d.lineno for d in getattr(node, "decorator_list", [])])
+        last = node.end_lineno or node.lineno
+        if blocks and first - 1 < blocks[-1][1]:
+            # shares a line with the previous statement (a; b)
+            prev_start, prev_end, nodes = blocks[-1]
+            blocks[-1] = (prev_start, max(prev_end, last), nodes + [node])
+        else:
+            blocks.append((start, last, [node]))
+        start = blocks[-1][1]
+    if blocks:
+        blocks[-1] = (blocks[-1][0], len(lines), blocks[-1][2])
+    elif lines:
+        blocks.append((0, len(lines), []))
+    return blocks
+
+
+def _is_def(node: ast.stmt) -> bool:
+    return isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))
+
+
+def _first_line(node: ast.stmt) -> int:
+    return min([node.lineno] + [d.lineno for d in getattr(node, "decorator_list", [])])
+
+
+def _import_state(
+    lines: List[str], nodes: List[ast.stmt], seen_docstring: bool, seen_non_imports: bool,
+) -> Tuple[bool, bool]:
+    """
+    (seen_docstring, seen_non_imports) after nodes, as pycodestyle's
+    module_imports_on_top_of_file (E402) tracks them: from the text of each
+    top-level logical line, where only the first string literal counts as the
+    docstring.
+    """
+    from pycodestyle import DUNDER_REGEX
+
+    for node in nodes:
+        if node.col_offset:
+            # after a semicolon: part of the previous statement's logical line
+            continue
+        line = lines[_first_line(node) - 1]
+        if line.startswith(("import ", "from ")):
+            continue
+        if re.match(DUNDER_REGEX, line) or line.startswith(_E402_KEYWORDS):
+            continue
+        text = line[1:] if line[0] in "uUbB" else line
+        text = text[1:] if text[:1] in ("r", "R") else text
+        if text[:1] in ("'", '"') and not seen_docstring:
+            seen_docstring = True
+        else:
+            seen_non_imports = True
+    return seen_docstring, seen_non_imports
+
+
+def _shift(value: Any, delta: int) -> Any:
+    # move radon block dicts (and their methods/closures) by delta lines
+    if isinstance(value, list):
+        return [_shift(v, delta) for v in value]
+    if not isinstance(value, dict):
+        return value
+    shifted = dict(value)
+    for key in ("lineno", "endline"):
+        if isinstance(shifted.get(key), int):
+            shifted[key] += delta
+    for key in ("methods", "closures"):
+        if key in shifted:
+            shifted[key] = _shift(shifted[key], delta)
+    return shifted
+
+
+def _local_checkers() -> Any:
+    engine = _flake8_engine()
+    checkers = engine.plugins.checkers
+    return checkers._replace(
+        tree=[p for p in checkers.tree if p.entry_name in LOCAL_TREE_PLUGINS]
+    )
+
+
+def _module_checkers(pyflakes: bool) -> Any:
+    # pyflakes ("F") alone, or the other whole-module AST plugins
+    engine = _flake8_engine()
+    checkers = engine.plugins.checkers
+    return checkers._replace(
+        tree=[
+            p for p in checkers.tree
+            if p.entry_name not in LOCAL_TREE_PLUGINS and (p.entry_name == "F") == pyflakes
+        ],
+        logical_line=[],
+        physical_line=[],
+    )
+
+
+def _block_issues(file_path: str, block_lines: List[str], prefix: List[str]) -> List[Dict[str, Any]]:
+    """
+    Block-local flake8 issues with line numbers relative to the block (line 1
+    is the block's first line).
+    """
+    issues = []
+    for issue in _flake8_engine().check(file_path, prefix + block_lines, _local_checkers()):
+        line = issue["line"] - len(prefix)
+        if line >= 1:
+            issues.append(dict(issue, line=line))
+    return issues
+
+
+def _block_metrics(block_lines: List[str], nodes: List[ast.stmt], start: int) -> Dict[str, Any]:
+    """
+    Block-local radon results, relative to the block like _block_issues.
+    """
+    from radon.cli.tools import cc_to_dict, raw_to_dict
+    from radon.raw import analyze
+    from radon.visitors import ComplexityVisitor, HalsteadVisitor
+
+    module = ast.Module(body=nodes, type_ignores=[])
+    cc = ComplexityVisitor.from_ast(module)
+    halstead = HalsteadVisitor.from_ast(module)
+    functions = [_shift(cc_to_dict(f), -start) for f in cc.functions]
+    classes = [
+        [_shift(cc_to_dict(c), -start)] + [_shift(cc_to_dict(m), -start) for m in c.methods]
+        for c in cc.classes
+    ]
+    return {
+        "functions": functions,
+        "classes": classes,
+        "total_complexity": cc.total_complexity,
+        "operators_seen": set(halstead.operators_seen),
+        # AST node operands are distinct by identity, so only their number matters
+        "operands_seen": {
+            (ctx, op) for ctx, op in halstead.operands_seen if not isinstance(op, ast.AST)
+        },
+        "node_operands": sum(
+            isinstance(op, ast.AST) for _, op in halstead.operands_seen
+        ),
+        "operators": halstead.operators,
+        "operands": halstead.operands,
+        "halstead_functions": [
+            (v.context, v.operators, v.operands, set(v.operators_seen), len(v.operands_seen))
+            for v in halstead.function_visitors
+        ],
+        "raw": raw_to_dict(analyze("".join(block_lines))),
+    }
+
+
+def _block_key(kind: str, fingerprint: str, *parts: str) -> str:
+    digest = hashlib.sha256()
+    digest.update(kind.encode("utf-8"))
+    digest.update(fingerprint.encode("utf-8"))
+    for part in parts:
+        digest.update(b"\0")
+        digest.update(part.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _cache_get(key: str) -> Optional[Any]:
+    with _block_cache_lock:
+        if key in _block_cache:
+            _block_cache.move_to_end(key)
+            return _block_cache[key]
+    return None
+
+
+def _cache_put(key: str, value: Any) -> None:
+    with _block_cache_lock:
+        _block_cache[key] = value
+        while len(_block_cache) > BLOCK_CACHE_SIZE:
+            _block_cache.popitem(last=False)
+
+
+def _cached_block(
+    kind: str, fingerprint: str, prefix: List[str], block_lines: List[str],
+    analyze: Callable[[], Any],
+) -> Tuple[Any, bool]:
+    key = _block_key(kind, fingerprint, "".join(prefix), "".join(block_lines))
+    result = _cache_get(key)
+    if result is not None:
+        return result, True
+    result = analyze()
+    _cache_put(key, result)
+    return result, False
+
+
+def _parse_and_split(source: str) -> Optional[Tuple[ast.Module, List[str], List[Any]]]:
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return None
+    lines = source.splitlines(True)
+    return tree, lines, split_blocks(lines, tree)
+
+
+def _parsed(source: Optional[str]) -> Optional[Tuple[ast.Module, List[str], List[Any]]]:
+    """
+    (tree, lines, blocks) for source, or None if it is missing or does not
+    parse. The analyzers run side by side on the same source, so the result is
+    shared between them (and concurrent callers wait for one parse). Callers
+    must not modify it.
+    """
+    if source is None:
+        return None
+    key = source_hash(source)
+    with _parse_lock:
+        if key in _parse_memo:
+            _parse_memo.move_to_end(key)
+            return _parse_memo[key]
+    parsed, _ = _parse_flight.do(key, _parse_and_split, source)
+    with _parse_lock:
+        _parse_memo[key] = parsed
+        while len(_parse_memo) > PARSE_MEMO_SIZE:
+            _parse_memo.popitem(last=False)
+    return parsed
+
+
+def _module_level(nodes: List[ast.stmt]) -> Any:
+    # every node executed in module scope: does not enter function, lambda or
+    # class bodies (class headers and decorators are module scope)
+    stack: List[ast.AST] = list(nodes)
+    while stack:
+        node = stack.pop()
+        yield node
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            defaults = node.args.defaults + [d for d in node.args.kw_defaults if d]
+            stack.extend(node.decorator_list + defaults)
+        elif isinstance(node, ast.ClassDef):
+            stack.extend(node.decorator_list + node.bases + node.keywords)
+        elif not isinstance(node, ast.Lambda):
+            stack.extend(ast.iter_child_nodes(node))
+
+
+def _has_string_annotations(fn: ast.AST, any_annotation: bool) -> bool:
+    # pyflakes parses strings in annotations (and some typing calls) as code;
+    # symtable does not see the names in them, nor any annotation names once
+    # `from __future__ import annotations` is on
+    for node in ast.walk(fn):
+        if node is fn:
+            continue
+        annotations: List[Optional[ast.expr]] = []
+        if isinstance(node, ast.AnnAssign):
+            annotations = [node.annotation]
+        elif isinstance(node, ast.arg):
+            annotations = [node.annotation]
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            annotations = [node.returns]
+        elif isinstance(node, ast.Call):
+            func = node.func
+            name = func.attr if isinstance(func, ast.Attribute) else getattr(func, "id", None)
+            if name in _STRING_ANNOTATION_CALLS and any(
+                isinstance(n, ast.Constant) and isinstance(n.value, str) for n in ast.walk(node)
+            ):
+                return True
+        for annotation in annotations:
+            if annotation is None:
+                continue
+            if any_annotation or any(
+                isinstance(n, ast.Constant) and isinstance(n.value, str)
+                for n in ast.walk(annotation)
+            ):
+                return True
+    return False
+
+
+def _function_scopes(fn: ast.AST, table: Any, lines: List[str], start: int) -> Optional[Dict[str, Any]]:
+    """
+    The module names fn's body reads and every name bound anywhere inside it,
+    with the body's line range relative to the block, or None if the body
+    cannot be stubbed: it declares globals, uses mangled private names or
+    string annotations, or starts on the def line.
+    """
+    first = fn.body[0]
+    if lines[first.lineno - start - 1][: first.col_offset].strip():
+        return None
+    if _has_string_annotations(fn, any_annotation=False):
+        return None
+    reads, binds = set(), set()
+    tables = [table]
+    while tables:
+        t = tables.pop()
+        tables.extend(t.get_children())
+        for sym in t.get_symbols():
+            name = sym.get_name()
+            if sym.is_declared_global():
+                return None
+            if name.startswith("_") and "__" in name[1:] and not name.endswith("__"):
+                return None
+            if sym.is_global():
+                if sym.is_referenced():
+                    reads.add(name)
+            elif sym.is_local() or sym.is_parameter():
+                binds.add(name)
+    decorators = getattr(fn, "decorator_list", [])
+    return {
+        "reads": sorted(reads),
+        "binds": sorted(binds),
+        "annotated": _has_string_annotations(fn, any_annotation=True),
+        "first": min([fn.lineno] + [d.lineno for d in decorators]) - start,
+        "body": first.lineno - start,
+        "end": fn.end_lineno - start,
+    }
+
+
+def _block_scopes(block_lines: List[str], nodes: List[ast.stmt], start: int) -> Optional[Dict[str, Any]]:
+    """
+    What pyflakes needs to know about a block when other blocks are stubbed:
+    the module names it binds, names whose module binding it makes uncertain
+    (deleted, annotated without a value, bound by except, declared global),
+    the names its functions declare global, the modules it star-imports, and
+    _function_scopes for its functions and methods by relative def line.
+    """
+    try:
+        table = symtable.symtable("".join(block_lines), "<block>", "exec")
+    except SyntaxError:
+        return None
+    bound = {s.get_name() for s in table.get_symbols() if s.is_assigned() or s.is_imported()}
+    unsafe, star = set(), set()
+    future_annotations = False
+    for node in _module_level(nodes):
+        if isinstance(node, ast.Delete):
+            unsafe.update(t.id for t in node.targets if isinstance(t, ast.Name))
+        elif isinstance(node, ast.AnnAssign) and node.value is None:
+            if isinstance(node.target, ast.Name):
+                unsafe.add(node.target.id)
+        elif isinstance(node, ast.ExceptHandler) and node.name:
+            unsafe.add(node.name)
+        elif isinstance(node, (ast.Global, ast.Nonlocal)):
+            unsafe.update(node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.module == "__future__":
+                future_annotations |= any(a.name == "annotations" for a in node.names)
+            if any(a.name == "*" for a in node.names):
+                star.add("." * node.level + (node.module or ""))
+    declared = set()
+    tables = list(table.get_children())
+    while tables:
+        t = tables.pop()
+        tables.extend(t.get_children())
+        declared.update(s.get_name() for s in t.get_symbols() if s.is_declared_global())
+
+    def namespace(parent: Any, node: ast.AST) -> Any:
+        try:
+            candidates = parent.lookup(node.name).get_namespaces()
+        except KeyError:
+            # a private method name, mangled in the class table
+            return None
+        for ns in candidates:
+            if ns.get_lineno() == node.lineno - start:
+                return ns
+        return None
+
+    functions = {}
+    for node in nodes:
+        if isinstance(node, ast.ClassDef):
+            owner = namespace(table, node)
+            members = [n for n in node.body if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))]
+        else:
+            owner = table
+            members = [node] if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) else []
+        for fn in members:
+            ns = namespace(owner, fn) if owner is not None else None
+            info = ns and _function_scopes(fn, ns, block_lines, start)
+            if info:
+                functions[fn.lineno - start] = info
+    return {
+        "bound": bound,
+        "unsafe": unsafe,
+        "declared": declared,
+        "star": star,
+        "future_annotations": future_annotations,
+        "functions": functions,
+    }
+
+
+def _stub_status(info: Dict[str, Any], module: Dict[str, Any]) -> Optional[str]:
+    """
+    What a function body's pyflakes findings depend on outside it: for each
+    module name it reads, whether the module binds it (plus the star-imported
+    modules, which show up in undefined-name messages). None when more than
+    that matters: it rebinds a module name, or reads one whose binding pyflakes
+    tracks in ways this does not model, or has annotations while `from
+    __future__ import annotations` hides their names from symtable.
+    """
+    reads = info["reads"]
+    if module["unsafe"].intersection(reads) or (info["annotated"] and module["future_annotations"]):
+        return None
+    if any(name in module["declared"] and name not in module["bound"] for name in reads):
+        return None
+    if module["bound"].intersection(info["binds"]) or module["declared"].intersection(info["binds"]):
+        return None
+    return repr(([(name, name in module["bound"]) for name in reads], sorted(module["star"])))
+
+
+def _stub(fn: ast.AST, reads: List[str]) -> ast.AST:
+    # same header, body replaced by one statement reading the same names
+    first = fn.body[0]
+    if reads:
+        load = [ast.Name(id=name, ctx=ast.Load()) for name in reads]
+        stmt: ast.stmt = ast.Expr(value=ast.Tuple(elts=load, ctx=ast.Load()))
+    else:
+        stmt = ast.Pass()
+    ast.fix_missing_locations(ast.copy_location(stmt, first))
+    stub = copy.copy(fn)
+    stub.body = [stmt]
+    return stub
+
+
+def _pyflakes_issues(
+    file_path: str, lines: List[str], tree: ast.Module, blocks: List[Any], fingerprint: str,
+) -> List[Dict[str, Any]]:
+    """
+    pyflakes findings for the whole module, with unchanged function and
+    method bodies stubbed out and their findings taken from the block cache.
+    """
+    engine = _flake8_engine()
+    checkers = _module_checkers(pyflakes=True)
+    if not checkers.tree:
+        return []
+    scopes = [] if engine.options.doctests else [
+        _cached_block(
+            "scopes", fingerprint, [], lines[start:end],
+            partial(_block_scopes, lines[start:end], nodes, start),
+        )[0]
+        for start, end, nodes in blocks
+    ]
+    if len(scopes) != len(blocks) or any(info is None for info in scopes):
+        return engine.check(file_path, lines, checkers, tree=tree)
+
+    module = {
+        "bound": set().union(*(info["bound"] for info in scopes)),
+        "unsafe": set().union(*(info["unsafe"] for info in scopes)),
+        "declared": set().union(*(info["declared"] for info in scopes)),
+        "star": set().union(*(info["star"] for info in scopes)),
+        "future_annotations": any(info["future_annotations"] for info in scopes),
+    }
+    reused: List[Tuple[int, int, int, List[Dict[str, Any]]]] = []
+    pending: List[Tuple[int, int, int, str]] = []
+
+    def stub_or_keep(fn: ast.AST, start: int, functions: Dict[int, Any]) -> ast.AST:
+        info = functions.get(fn.lineno - start)
+        status = info and _stub_status(info, module)
+        if not status:
+            return fn
+        first, body_start, end = (start + info[k] for k in ("first", "body", "end"))
+        key = _block_key("pyflakes", fingerprint, status, "".join(lines[first - 1:end]))
+        found = _cache_get(key)
+        if found is None:
+            pending.append((first, body_start, end, key))
+            return fn
+        reused.append((first, body_start, end, found))
+        return _stub(fn, info["reads"])
+
+    body: List[ast.stmt] = []
+    for (start, _, nodes), info in zip(blocks, scopes):
+        for node in nodes:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                node = stub_or_keep(node, start, info["functions"])
+            elif isinstance(node, ast.ClassDef):
+                members = [
+                    stub_or_keep(n, start, info["functions"])
+                    if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef)) else n
+                    for n in node.body
+                ]
+                if any(a is not b for a, b in zip(members, node.body)):
+                    node = copy.copy(node)
+                    node.body = members
+            body.append(node)
+    stubbed = ast.Module(body=body, type_ignores=tree.type_ignores)
+
+    issues = engine.check(file_path, lines, checkers, tree=stubbed)
+    for first, body_start, end, key in pending:
+        _cache_put(key, [
+            dict(i, line=i["line"] - first) for i in issues if body_start <= i["line"] <= end
+        ])
+    for first, body_start, end, found in reused:
+        issues = [i for i in issues if not body_start <= i["line"] <= end]
+        issues.extend(dict(i, line=i["line"] + first) for i in found)
+    issues.sort(key=lambda i: (i["line"], i["col"]))
+    return issues
+
+
+def _starts_line(node: ast.stmt, lines: List[str]) -> bool:
+    return not lines[node.lineno - 1][: node.col_offset].strip()
+
+
+def _open_indents(node: ast.stmt, lines: List[str]) -> int:
+    """
+    How many indentation levels are still open after node's last line, i.e.
+    how many DEDENT tokens come before the next top-level statement.
+    """
+    depth = 0
+    while True:
+        clauses = [getattr(node, f, None) or [] for f in ("body", "orelse", "finalbody")]
+        clauses += [c.body for c in getattr(node, "handlers", []) + getattr(node, "cases", [])]
+        clauses = [c for c in clauses if c and isinstance(c[0], ast.stmt)]
+        if not clauses:
+            return depth
+        last = max(clauses, key=lambda c: (c[-1].end_lineno, c[-1].end_col_offset))
+        if not _starts_line(last[0], lines):
+            # `if x: y` has no indented block
+            return depth
+        depth += 1
+        node = last[-1]
+
+
+def _prefix(
+    prev: ast.stmt, depth: int, indented: bool, seen_docstring: bool, seen_non_imports: bool,
+) -> List[str]:
+    """
+    Stand-in lines for everything before a block, so pycodestyle checks at
+    its start see the same state as in the full file: whether the previous
+    top-level statement was a def or class (E305), how many indentation levels
+    it leaves open (the DEDENT tokens E741 looks at) and whether its last line
+    is indented (the one-liner exception of E302), and the E402 state.
+    """
+    if not seen_non_imports:
+        head, one_line, continued = "if _:", "import _", "from _ import ("
+        inner = "import _"
+    elif isinstance(prev, ast.AsyncFunctionDef):
+        head, one_line, continued = "async def _():", "async def _(): pass", "async def _(): ("
+        inner = "pass"
+    elif _is_def(prev):
+        head, one_line, continued = "def _():", "def _(): pass", "def _(): ("
+        inner = "pass"
+    else:
+        # not `if`, which E402 allows among the imports
+        head, one_line, continued = "while _:", "pass", "_ = ("
+        inner = "pass"
+    docstring = ['""\n'] if seen_docstring else []
+    if not depth:
+        return docstring + ([continued + "\n", "    _)\n"] if indented else [one_line + "\n"])
+    nested = ["    " * level + "if _:\n" for level in range(1, depth)]
+    pad = "    " * depth
+    last = [pad + inner + "\n"] if indented else [pad + "_ = \"\"\"\n", '"""\n']
+    return docstring + [head + "\n"] + nested + last
+
+
+def _with_prefixes(
+    lines: List[str], blocks: List[Tuple[int, int, List[ast.stmt]]],
+) -> List[Tuple[Tuple[int, int, List[ast.stmt]], List[str]]]:
+    # pair each block with the pycodestyle context of the blocks before it
+    paired = []
+    prefix: List[str] = []
+    seen_docstring = seen_non_imports = False
+    for block in blocks:
+        paired.append((block, prefix))
+        _, end, nodes = block
+        if nodes:
+            seen_docstring, seen_non_imports = _import_state(
+                lines, nodes, seen_docstring, seen_non_imports
+            )
+            prefix = _prefix(
+                nodes[-1], _open_indents(nodes[-1], lines), lines[end - 1][:1] in (" ", "\t"),
+                seen_docstring, seen_non_imports,
+            )
+    return paired
+
+
+def _halstead_report(operators_seen: set, distinct_operands: int, operators: int, operands: int) -> Dict[str, Any]:
+    from radon.metrics import halstead_visitor_report
+    from radon.visitors import HalsteadVisitor
+
+    visitor = HalsteadVisitor()
+    visitor.operators_seen = operators_seen
+    visitor.operands_seen = set(range(distinct_operands))
+    visitor.operators = operators
+    visitor.operands = operands
+    return halstead_visitor_report(visitor)._asdict()
+
+
+def analyze_flake8_incremental(file_path: str, source: Optional[str]) -> Dict[str, Any]:
+    """
+    Analyzer with the flake8 analyzer's report key, plus
+    report["flake8_incremental"] = {blocks, reused}. Falls back to the full
+    analyzer when the source is missing or does not parse.
+    """
+    parsed = _parsed(source)
+    if parsed is None:
+        report = _flake8_analyzer(file_path, source)
+        report["flake8_incremental"] = None
+        return report
+
+    from flake8.processor import FileProcessor
+
+    engine = _flake8_engine()
+    tree, lines, split = parsed
+    if FileProcessor(file_path, engine.options, lines=list(lines)).should_ignore_file():
+        return {"flake8_issues": [], "flake8_incremental": {"blocks": 0, "reused": 0}}
+    # per-file-ignores decide which block issues are kept, so the path counts too
+    fingerprint = repr(sorted({**analysis_fingerprint(), **path_fingerprint(file_path)}.items()))
+    blocks = _with_prefixes(lines, split)
+
+    issues: List[Dict[str, Any]] = []
+    reused = 0
+    for (start, end, _), prefix in blocks:
+        block_issues, hit = _cached_block(
+            "flake8", fingerprint, prefix, lines[start:end],
+            partial(_block_issues, file_path, lines[start:end], prefix),
+        )
+        issues.extend(dict(i, line=i["line"] + start) for i in block_issues)
+        reused += hit
+
+    module_issues = _pyflakes_issues(file_path, lines, tree, split, fingerprint)
+    others = _module_checkers(pyflakes=False)
+    if others.tree:
+        module_issues += engine.check(file_path, lines, others, tree=tree)
+        module_issues.sort(key=lambda i: (i["line"], i["col"]))
+    # AST plugin results first on ties, as in a full flake8 run
+    issues = module_issues + issues
+    issues.sort(key=lambda i: (i["line"], i["col"]))
+    return {"flake8_issues": issues, "flake8_incremental": {"blocks": len(blocks), "reused": reused}}
+
+
+def analyze_radon_incremental(file_path: str, source: Optional[str]) -> Dict[str, Any]:
+    """
+    Analyzer with the radon analyzer's report keys, plus
+    report["radon_incremental"] = {blocks, reused}. Falls back to the full
+    analyzer when the source is missing or does not parse.
+    """
+    parsed = _parsed(source)
+    if parsed is None:
+        report = _radon_analyzer(file_path, source)
+        report["radon_incremental"] = None
+        return report
+
+    from radon.metrics import mi_compute, mi_rank
+    from radon.raw import Module as RawModule
+
+    fingerprint = repr(sorted(analysis_fingerprint().items()))
+    _, lines, blocks = parsed
+
+    functions: List[Dict[str, Any]] = []
+    classes: List[Dict[str, Any]] = []
+    operators_seen: set = set()
+    operands_seen: set = set()
+    operators = operands = node_operands = 0
+    total_complexity = 0
+    # same keys as the full analyzer, even with no blocks
+    raw: Dict[str, int] = dict.fromkeys(RawModule._fields, 0)
+    halstead_functions = {}
+    reused = 0
+    for start, end, nodes in blocks:
+        r, hit = _cached_block(
+            "radon", fingerprint, [], lines[start:end],
+            partial(_block_metrics, lines[start:end], nodes, start),
+        )
+        reused += hit
+        functions.extend(_shift(r["functions"], start))
+        for entry in r["classes"]:
+            classes.extend(_shift(entry, start))
+        operators_seen |= r["operators_seen"]
+        operands_seen |= r["operands_seen"]
+        node_operands += r["node_operands"]
+        operators += r["operators"]
+        operands += r["operands"]
+        total_complexity += r["total_complexity"]
+        for key, value in r["raw"].items():
+            raw[key] = raw.get(key, 0) + value
+        for name, n1, n2, ops_seen, h2 in r["halstead_functions"]:
+            halstead_functions[name] = _halstead_report(ops_seen, h2, n1, n2)
+    # every block visitor counts the module's base complexity of 1
+    total_complexity -= max(len(blocks) - 1, 0)
+
+    halstead_total = _halstead_report(
+        operators_seen, len(operands_seen) + node_operands, operators, operands
+    )
+    sloc = raw.get("sloc", 0)
+    comments = (raw.get("comments", 0) + raw.get("multi", 0)) / float(sloc) * 100 if sloc else 0
+    mi = mi_compute(halstead_total["volume"], total_complexity, raw.get("lloc", 0), comments)
+    cc_blocks = sorted(functions + classes, key=lambda b: -b["complexity"])
+
+    return {
+        "radon_cc": {file_path: cc_blocks} if cc_blocks else {},
+        "radon_mi": {file_path: {"mi": mi, "rank": mi_rank(mi)}},
+        "radon_raw": {file_path: raw},
+        "radon_halstead": {
+            file_path: {"total": halstead_total, "functions": halstead_functions}
+        },
+        "radon_incremental": {"blocks": len(blocks), "reused": reused},
+    }
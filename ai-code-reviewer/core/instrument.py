@@ -0,0 +1,99 @@
+# core/instrument.py
+"""
+Stage-level timing and resource measurements.
+
+    timings = {}
+    with stage(timings, "flake8") as record:
+        ...
+        record["cache"] = "miss"
+
+leaves timings["flake8"] = {wall, cpu, peak_rss_kb, subprocesses, cache}.
+
+  * wall: elapsed seconds
+  * cpu: CPU seconds of the calling thread plus any child processes that
+    finished during the stage
+  * peak_rss_kb: the process's (or a child's) peak resident memory so far;
+    a high-water mark, so a stage that raises it is the one that needed it
+  * subprocesses: processes started during the stage (see note_subprocess)
+  * cache: "hit", "miss" or None when no cache was involved
+
+Peak memory is None where the resource module is missing (Windows).
+"""
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_current = threading.local()
+
+
+def _children_cpu() -> float:
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def peak_rss_kb() -> Optional[int]:
+    if resource is None:
+        return None
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    # bytes on macOS, kilobytes elsewhere
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def note_subprocess() -> None:
+    """
+    Count a started subprocess against the stage running in this thread.
+    """
+    record = getattr(_current, "record", None)
+    if record is not None:
+        record["subprocesses"] += 1
+
+
+@contextmanager
+def stage(timings: Dict[str, Any], name: str) -> Iterator[Dict[str, Any]]:
+    """
+    Measure the enclosed block and store the record as timings[name]. Stages
+    may nest; subprocesses of an inner stage also count for the outer one.
+    """
+    record: Dict[str, Any] = {
+        "wall": None, "cpu": None, "peak_rss_kb": None, "subprocesses": 0, "cache": None,
+    }
+    parent = getattr(_current, "record", None)
+    _current.record = record
+    wall = time.perf_counter()
+    cpu = time.thread_time()
+    child_cpu = _children_cpu()
+    try:
+        yield record
+    finally:
+        _current.record = parent
+        record["wall"] = round(time.perf_counter() - wall, 4)
+        record["cpu"] = round(time.thread_time() - cpu + _children_cpu() - child_cpu, 4)
+        record["peak_rss_kb"] = peak_rss_kb()
+        timings[name] = record
+        if parent is not None:
+            parent["subprocesses"] += record["subprocesses"]
+
+
+def total_record(timings: Dict[str, Any], wall_start: float, cpu_start: float) -> Dict[str, Any]:
+    """
+    Whole-call record from time.perf_counter() and time.process_time() taken
+    at the start. CPU is process-wide, so it includes concurrent stages.
+    """
+    return {
+        "wall": round(time.perf_counter() - wall_start, 4),
+        "cpu": round(time.process_time() - cpu_start, 4),
+        "peak_rss_kb": peak_rss_kb(),
+        "subprocesses": sum(r.get("subprocesses", 0) for r in timings.values()),
+    }
@@ -0,0 +1,142 @@
+# core/issue_index.py
+"""
+Columnar in-memory index over flake8 issues, for browsing very long lists.
+
+Each field is stored once as a column (line and col numbers in arrays, codes
+and severities as small integer ids into a table of distinct values), so
+filtering and sorting tens of thousands of issues touches a few compact
+arrays instead of a list of dicts. Only the rows of the requested page are
+turned back into dicts:
+
+    index = IssueIndex(report["flake8_issues"])
+    rows = index.select(codes=["E501"], severities=["style"], lines=(1, 500))
+    page = index.page(rows, page=0, page_size=100)
+"""
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+SEVERITIES = ("error", "warning", "style", "complexity", "other")
+SORT_KEYS = ("line", "code", "severity")
+
+
+def severity_of(code: str) -> str:
+    """
+    error: pyflakes (F) and E9 syntax/IO errors; warning: pycodestyle W;
+    style: other pycodestyle E; complexity: mccabe C90; other: plugins.
+    """
+    if code.startswith("F") or code.startswith("E9"):
+        return "error"
+    if code.startswith("W"):
+        return "warning"
+    if code.startswith("E"):
+        return "style"
+    if code.startswith("C9"):
+        return "complexity"
+    return "other"
+
+
+class IssueIndex:
+    def __init__(self, issues: Iterable[Dict[str, Any]]):
+        self.lines = array("l")
+        self.cols = array("l")
+        self.code_ids = array("l")
+        self.messages: List[str] = []
+        self.code_names: List[str] = []
+        # analyzer failures ({"error": ...}) are kept aside, not indexed
+        self.errors: List[str] = []
+        code_lookup: Dict[str, int] = {}
+        for issue in issues:
+            if "error" in issue:
+                self.errors.append(str(issue["error"]))
+                continue
+            code = issue.get("code") or ""
+            code_id = code_lookup.get(code)
+            if code_id is None:
+                code_id = code_lookup[code] = len(self.code_names)
+                self.code_names.append(code)
+            self.lines.append(int(issue.get("line") or 0))
+            self.cols.append(int(issue.get("col") or 0))
+            self.code_ids.append(code_id)
+            self.messages.append(issue.get("message") or "")
+        self.code_severities = [SEVERITIES.index(severity_of(c)) for c in self.code_names]
+        self.severity_ids = array("l", (self.code_severities[c] for c in self.code_ids))
+        self._max_line = max(self.lines) if self.lines else 0
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def max_line(self) -> int:
+        return self._max_line
+
+    def code_counts(self) -> Dict[str, int]:
+        """
+        Issues per code, most frequent first.
+        """
+        counts = [0] * len(self.code_names)
+        for code_id in self.code_ids:
+            counts[code_id] += 1
+        ranked = sorted(range(len(counts)), key=lambda i: (-counts[i], self.code_names[i]))
+        return {self.code_names[i]: counts[i] for i in ranked}
+
+    def severity_counts(self) -> Dict[str, int]:
+        counts = [0] * len(SEVERITIES)
+        for severity_id in self.severity_ids:
+            counts[severity_id] += 1
+        return {name: n for name, n in zip(SEVERITIES, counts) if n}
+
+    def select(
+        self,
+        codes: Optional[Sequence[str]] = None,
+        severities: Optional[Sequence[str]] = None,
+        lines: Optional[Tuple[Optional[int], Optional[int]]] = None,
+        sort: str = "line",
+        descending: bool = False,
+    ) -> array:
+        """
+        Row ids matching every given filter, sorted. codes match exactly or
+        as prefixes ("E1" selects E101, E111, ...); lines is an inclusive
+        (first, last) range where either end may be None.
+        """
+        if sort not in SORT_KEYS:
+            raise ValueError(f"unknown sort key: {sort!r}")
+        wanted = set(range(len(self.code_names)))
+        if codes:
+            prefixes = tuple(codes)
+            wanted &= {i for i, name in enumerate(self.code_names) if name.startswith(prefixes)}
+        if severities:
+            wanted_severities = {SEVERITIES.index(s) for s in severities if s in SEVERITIES}
+            wanted &= {i for i, s in enumerate(self.code_severities) if s in wanted_severities}
+        first, last = lines or (None, None)
+        first = first if first is not None else -1
+        last = last if last is not None else max(self._max_line, first)
+        code_ids, line_nos = self.code_ids, self.lines
+        if len(wanted) == len(self.code_names):
+            rows = [i for i in range(len(self)) if first <= line_nos[i] <= last]
+        else:
+            rows = [i for i in range(len(self)) if code_ids[i] in wanted and first <= line_nos[i] <= last]
+        cols = self.cols
+        if sort == "line":
+            rows.sort(key=lambda i: (line_nos[i], cols[i]), reverse=descending)
+        elif sort == "code":
+            names = self.code_names
+            rows.sort(key=lambda i: (names[code_ids[i]], line_nos[i], cols[i]), reverse=descending)
+        else:
+            severity_ids = self.severity_ids
+            rows.sort(key=lambda i: (severity_ids[i], line_nos[i], cols[i]), reverse=descending)
+        return array("l", rows)
+
+    def page(self, rows: Sequence[int], page: int = 0, page_size: int = 100) -> List[Dict[str, Any]]:
+        """
+        Materialize one page of rows (0-based page number) as issue dicts.
+        """
+        start = max(page, 0) * page_size
+        return [
+            {
+                "line": self.lines[i],
+                "col": self.cols[i],
+                "code": self.code_names[self.code_ids[i]],
+                "severity": SEVERITIES[self.severity_ids[i]],
+                "message": self.messages[i],
+            }
+            for i in rows[start:start + page_size]
+        ]
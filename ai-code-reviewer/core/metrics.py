@@ -0,0 +1,280 @@
+# core/metrics.py
+"""
+Service metrics in the Prometheus text exposition format.
+
+analyze_source, the formatter (get_formatted_source, which the app uses, and
+get_formatted_copy) and the worker pools record into the process-wide registry
+here; render() returns the current values. Expose them
+with serve_metrics(port) (GET /metrics on 127.0.0.1) or with
+start_file_exporter(path), which rewrites the file every few seconds for
+node_exporter's textfile collector. start_exporters_from_env() does either,
+driven by AI_CODE_REVIEWER_METRICS_PORT / AI_CODE_REVIEWER_METRICS_FILE.
+
+Metrics (all prefixed ai_code_reviewer_):
+  analyses_total{cached,coalesced}        rate() gives analyses per second
+  analysis_seconds                        histogram of whole analyses
+  analyzer_seconds{analyzer}              histogram per analyzer
+  analyzer_failures_total{analyzer,status}
+  bytes_analyzed_total
+  cache_requests_total{cache,result}      cache = analysis | format
+  cache_hit_ratio{cache}
+  formats_total{result}, format_seconds
+  queue_depth{pool}, workers{pool}, workers_busy{pool}
+  worker_busy_seconds_total{pool}         rate() / workers = utilization
+  worker_timeouts_total{pool}             jobs killed with their worker
+
+pool is "batch" (python -m core), "daemon", or "analyzer-<name>" for the
+worker processes that run one analyzer on large sources.
+"""
+import http.server
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+PREFIX = "ai_code_reviewer_"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+DEFAULT_FILE_INTERVAL = 5.0
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (
+        k + '="' + v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for k, v in pairs
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str):
+        self.name = PREFIX + name
+        self.help = help_text
+        self._lock = threading.Lock()
+        self._values: Dict[LabelKey, Any] = {}
+        REGISTRY.append(self)
+
+    def samples(self) -> List[Tuple[str, LabelKey, Optional[Tuple[str, str]], float]]:
+        with self._lock:
+            return [(self.name, key, None, value) for key, value in sorted(self._values.items())]
+
+    def value(self, **labels: Any) -> Any:
+        with self._lock:
+            return self._values.get(_labels(labels))
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = _labels(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        with self._lock:
+            self._values[_labels(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = _labels(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text)
+        self.buckets = tuple(buckets) + (float("inf"),)
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = _labels(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._values[key] = (counts, total + value)
+
+    def samples(self) -> List[Tuple[str, LabelKey, Optional[Tuple[str, str]], float]]:
+        out = []
+        with self._lock:
+            for key, (counts, total) in sorted(self._values.items()):
+                for bound, count in zip(self.buckets, counts):
+                    out.append((self.name + "_bucket", key, ("le", _format_value(bound)), count))
+                out.append((self.name + "_sum", key, None, total))
+                out.append((self.name + "_count", key, None, counts[-1]))
+        return out
+
+
+class _HitRatio(Gauge):
+    # derived from cache_requests_total when rendered
+    def samples(self) -> List[Tuple[str, LabelKey, Optional[Tuple[str, str]], float]]:
+        totals: Dict[str, List[float]] = {}
+        for _, key, _, value in CACHE_REQUESTS.samples():
+            labels = dict(key)
+            hits_misses = totals.setdefault(labels.get("cache", ""), [0.0, 0.0])
+            hits_misses[0 if labels.get("result") == "hit" else 1] += value
+        return [
+            (self.name, (("cache", cache),), None, hits / (hits + misses))
+            for cache, (hits, misses) in sorted(totals.items())
+            if hits + misses
+        ]
+
+
+REGISTRY: List[_Metric] = []
+
+ANALYSES = Counter("analyses_total", "Completed analyses.")
+ANALYSIS_SECONDS = Histogram("analysis_seconds", "Wall time of whole analyses.")
+ANALYZER_SECONDS = Histogram("analyzer_seconds", "Wall time per analyzer.")
+ANALYZER_FAILURES = Counter("analyzer_failures_total", "Analyzers that errored or timed out.")
+BYTES_ANALYZED = Counter("bytes_analyzed_total", "Source bytes analyzed.")
+CACHE_REQUESTS = Counter("cache_requests_total", "Result cache lookups by outcome.")
+CACHE_HIT_RATIO = _HitRatio("cache_hit_ratio", "Cache hits / lookups since start.")
+FORMATS = Counter("formats_total", "Formatter runs (get_formatted_source/_copy) by result.")
+FORMAT_SECONDS = Histogram("format_seconds", "Wall time of formatter runs.")
+QUEUE_DEPTH = Gauge("queue_depth", "Work items waiting for a worker.")
+WORKERS = Gauge("workers", "Worker capacity of the pool.")
+WORKERS_BUSY = Gauge("workers_busy", "Workers currently running an item.")
+WORKER_BUSY_SECONDS = Counter("worker_busy_seconds_total", "Time workers spent on items.")
+WORKER_TIMEOUTS = Counter("worker_timeouts_total", "Items that overran their deadline.")
+START_TIME = Gauge("process_start_time_seconds", "Unix time the process started.")
+START_TIME.set(time.time())
+
+
+def observe_analysis(report: Dict[str, Any], nbytes: Optional[int]) -> None:
+    """
+    Record one analyze_source report.
+    """
+    timings = report.get("timings") or {}
+    ANALYSES.inc(
+        cached=str(bool(report.get("cached"))).lower(),
+        coalesced=str(bool(report.get("coalesced"))).lower(),
+    )
+    if "total" in timings:
+        ANALYSIS_SECONDS.observe(timings["total"]["wall"])
+    lookup = timings.get("cache_lookup")
+    if lookup and lookup.get("cache"):
+        CACHE_REQUESTS.inc(cache="analysis", result=lookup["cache"])
+    if nbytes:
+        BYTES_ANALYZED.inc(nbytes)
+    if report.get("cached") or report.get("coalesced"):
+        # the analyzers ran for another call (or not at all)
+        return
+    for name, status in (report.get("analyzers") or {}).items():
+        if status.get("seconds") is not None:
+            ANALYZER_SECONDS.observe(status["seconds"], analyzer=name)
+        if status.get("status") != "ok":
+            ANALYZER_FAILURES.inc(analyzer=name, status=status.get("status"))
+
+
+def observe_format(success: bool, seconds: float, timings: Dict[str, Any]) -> None:
+    FORMATS.inc(result="ok" if success else "error")
+    FORMAT_SECONDS.observe(seconds)
+    lookup = timings.get("cache_lookup")
+    if lookup and lookup.get("cache"):
+        CACHE_REQUESTS.inc(cache="format", result=lookup["cache"])
+
+
+def render() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for name, key, extra, value in metric.samples():
+            lines.append(f"{name}{_format_labels(key, extra)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+
+def serve_metrics(port: int, host: str = "127.0.0.1") -> http.server.ThreadingHTTPServer:
+    """
+    Serve /metrics on a background thread and return the server.
+    """
+    server = http.server.ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+def write_metrics_file(path: str) -> None:
+    # write then rename, so a scraper never reads a half-written file
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(render())
+    os.replace(tmp, path)
+
+
+def start_file_exporter(path: str, interval: float = DEFAULT_FILE_INTERVAL) -> threading.Thread:
+    def loop() -> None:
+        while True:
+            try:
+                write_metrics_file(path)
+            except OSError:
+                pass
+            time.sleep(interval)
+
+    thread = threading.Thread(target=loop, name="metrics-file", daemon=True)
+    thread.start()
+    return thread
+
+
+_exporters_started = False
+_exporters_lock = threading.Lock()
+
+
+def start_exporters_from_env() -> None:
+    """
+    Start the exporters configured in the environment, once per process.
+    """
+    global _exporters_started
+    with _exporters_lock:
+        if _exporters_started:
+            return
+        _exporters_started = True
+        port = os.environ.get("AI_CODE_REVIEWER_METRICS_PORT")
+        if port:
+            serve_metrics(int(port))
+        path = os.environ.get("AI_CODE_REVIEWER_METRICS_FILE")
+        if path:
+            interval = float(os.environ.get("AI_CODE_REVIEWER_METRICS_INTERVAL", DEFAULT_FILE_INTERVAL))
+            start_file_exporter(path, interval)
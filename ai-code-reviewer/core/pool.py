@@ -0,0 +1,154 @@
+# core/pool.py
+"""
+Process-wide bounded worker pool for interactive requests.
+
+All UI sessions submit their analysis and formatting work to one pool with a
+fixed number of worker threads and a FIFO queue, so a burst of clicks queues
+up instead of starting dozens of analyses at once. Each submission returns a
+Ticket that knows its place in the queue.
+
+The size is AI_CODE_REVIEWER_MAX_CONCURRENT (default: CPU count); with
+AI_CODE_REVIEWER_MAX_QUEUE set, submissions beyond that many waiting items
+raise PoolBusy instead of queueing without bound.
+"""
+import collections
+import os
+import threading
+import time
+from concurrent.futures import Future
+from functools import lru_cache
+from typing import Any, Callable, Deque, Optional
+
+from core.metrics import QUEUE_DEPTH, WORKER_BUSY_SECONDS, WORKERS, WORKERS_BUSY
+
+
+class PoolBusy(RuntimeError):
+    pass
+
+
+class Ticket:
+    """
+    Handle for one submitted call: a Future plus queue bookkeeping.
+    """
+
+    def __init__(self, pool: "WorkerPool", fn: Callable, args: tuple, kwargs: dict):
+        self.future: Future = Future()
+        self.submitted_at = time.monotonic()
+        self.started_at: Optional[float] = None
+        self._pool = pool
+        self._call = (fn, args, kwargs)
+
+    def position(self) -> int:
+        """
+        1 for the next item to start, 2 behind it, ...; 0 once running or done.
+        """
+        return self._pool._position(self)
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def cancel(self) -> bool:
+        """
+        Drop the call if it has not started yet.
+        """
+        return self._pool._cancel(self)
+
+    def result(self, timeout: Optional[float] = None) -> Any:
+        return self.future.result(timeout)
+
+    def queue_seconds(self) -> float:
+        end = self.started_at if self.started_at is not None else time.monotonic()
+        return end - self.submitted_at
+
+
+class WorkerPool:
+    def __init__(self, max_workers: int, max_queue: int = 0, name: str = "app"):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.name = name
+        self._queue: Deque[Ticket] = collections.deque()
+        self._cond = threading.Condition()
+        self._busy = 0
+        self._shutdown = False
+        WORKERS.set(max_workers, pool=name)
+        self._threads = [
+            threading.Thread(target=self._work, name=f"{name}-worker-{i}", daemon=True)
+            for i in range(max_workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, fn: Callable, *args: Any, **kwargs: Any) -> Ticket:
+        ticket = Ticket(self, fn, args, kwargs)
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("pool is shut down")
+            if self.max_queue and len(self._queue) >= self.max_queue:
+                raise PoolBusy(f"{len(self._queue)} requests are already waiting")
+            self._queue.append(ticket)
+            self._update_gauges()
+            self._cond.notify()
+        return ticket
+
+    def _position(self, ticket: Ticket) -> int:
+        with self._cond:
+            try:
+                return self._queue.index(ticket) + 1
+            except ValueError:
+                return 0
+
+    def _cancel(self, ticket: Ticket) -> bool:
+        with self._cond:
+            try:
+                self._queue.remove(ticket)
+            except ValueError:
+                return False
+            self._update_gauges()
+        return ticket.future.cancel()
+
+    def queue_depth(self) -> int:
+        with self._cond:
+            return len(self._queue)
+
+    def _update_gauges(self) -> None:
+        QUEUE_DEPTH.set(len(self._queue), pool=self.name)
+        WORKERS_BUSY.set(self._busy, pool=self.name)
+
+    def _work(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue and not self._shutdown:
+                    self._cond.wait()
+                if self._shutdown and not self._queue:
+                    return
+                ticket = self._queue.popleft()
+                self._busy += 1
+                self._update_gauges()
+            ticket.started_at = time.monotonic()
+            if ticket.future.set_running_or_notify_cancel():
+                fn, args, kwargs = ticket._call
+                try:
+                    ticket.future.set_result(fn(*args, **kwargs))
+                except BaseException as e:
+                    ticket.future.set_exception(e)
+            WORKER_BUSY_SECONDS.inc(time.monotonic() - ticket.started_at, pool=self.name)
+            with self._cond:
+                self._busy -= 1
+                self._update_gauges()
+
+    def shutdown(self) -> None:
+        with self._cond:
+            self._shutdown = True
+            self._cond.notify_all()
+
+
+def default_workers() -> int:
+    return int(os.environ.get("AI_CODE_REVIEWER_MAX_CONCURRENT", os.cpu_count() or 1))
+
+
+@lru_cache(maxsize=None)
+def shared_pool() -> WorkerPool:
+    """
+    The process-wide pool, created on first use.
+    """
+    return WorkerPool(default_workers(), int(os.environ.get("AI_CODE_REVIEWER_MAX_QUEUE", 0)))
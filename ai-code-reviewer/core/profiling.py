@@ -0,0 +1,136 @@
+# core/profiling.py
+"""
+Opt-in cProfile + tracemalloc profiling.
+
+Set AI_CODE_REVIEWER_PROFILE=1 (or use the app's "Profile this run" toggle)
+and each profiled run writes to outputs/profiles/:
+
+  * <name>-<stamp>.prof: cProfile stats, for pstats, snakeviz, etc.
+  * <name>-<stamp>.txt: the top functions by cumulative time and the top
+    allocation sites with the peak traced memory
+
+The report links both files under report["profile"]. When profiling is off,
+the only cost is reading one environment variable; the profiler modules are
+imported on first use.
+"""
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional
+
+PROFILE_DIR = Path(__file__).parent.parent / "outputs" / "profiles"
+DEFAULT_TOP = 20
+
+_counter = itertools.count()
+
+# tracemalloc is process-wide: concurrent profiled runs share one tracing
+# session, and only the last one out stops it (if a profiled run started it)
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_tracing_owned = False
+
+
+def profiling_enabled() -> bool:
+    return os.environ.get("AI_CODE_REVIEWER_PROFILE", "") not in ("", "0")
+
+
+class InlineExecutor(Executor):
+    """
+    Runs submitted calls immediately in the calling thread. cProfile only
+    sees its own thread, so profiled analyses run their analyzers this way.
+    """
+
+    def submit(self, fn: Callable, *args: Any, **kwargs: Any) -> Future:
+        future: Future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+
+def _summary(profiler: Any, snapshot: Any, peak: int, top: int) -> Dict[str, Any]:
+    import pstats
+
+    stats = pstats.Stats(profiler)
+    stats.sort_stats("cumulative")
+    functions = []
+    for func in stats.fcn_list[:top]:
+        calls, _, total, cumulative, _ = stats.stats[func]
+        filename, line, name = func
+        functions.append({
+            "function": f"{filename}:{line}({name})",
+            "calls": calls,
+            "total": round(total, 4),
+            "cumulative": round(cumulative, 4),
+        })
+    allocations = []
+    if snapshot is not None:
+        for stat in snapshot.statistics("lineno")[:top]:
+            frame = stat.traceback[0]
+            allocations.append({
+                "site": f"{frame.filename}:{frame.lineno}",
+                "size_kb": round(stat.size / 1024, 1),
+                "count": stat.count,
+            })
+    return {"top_functions": functions, "top_allocations": allocations, "peak_memory_kb": peak // 1024}
+
+
+@contextmanager
+def profile_run(name: str, enabled: Optional[bool] = None, top: int = DEFAULT_TOP) -> Iterator[Optional[Dict[str, Any]]]:
+    """
+    Profile the enclosed block. Yields None when profiling is off; otherwise
+    a dict that is filled in on exit with {profile, summary, top_functions,
+    top_allocations, peak_memory_kb}.
+    """
+    if enabled is None:
+        enabled = profiling_enabled()
+    if not enabled:
+        yield None
+        return
+    # only profiled runs pay for these imports
+    import cProfile
+    import io
+    import pstats
+    import tracemalloc
+
+    global _tracing_users, _tracing_owned
+    info: Dict[str, Any] = {}
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_owned = True
+        if _tracing_users == 0:
+            # with overlapping runs the peak covers all of them
+            tracemalloc.reset_peak()
+        _tracing_users += 1
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield info
+    finally:
+        profiler.disable()
+        with _tracing_lock:
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            _tracing_users -= 1
+            if _tracing_users == 0 and _tracing_owned:
+                tracemalloc.stop()
+                _tracing_owned = False
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        stem = f"{name}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{next(_counter)}"
+        prof_path = PROFILE_DIR / (stem + ".prof")
+        profiler.dump_stats(str(prof_path))
+        info.update(_summary(profiler, snapshot, peak, top))
+        text = io.StringIO()
+        pstats.Stats(profiler, stream=text).sort_stats("cumulative").print_stats(top)
+        text.write(f"\nPeak traced memory: {info['peak_memory_kb']} KiB\n\nTop allocation sites:\n")
+        for a in info["top_allocations"]:
+            text.write(f"  {a['size_kb']:>10} KiB  {a['count']:>8}  {a['site']}\n")
+        summary_path = PROFILE_DIR / (stem + ".txt")
+        summary_path.write_text(text.getvalue(), encoding="utf-8")
+        info.update(profile=str(prof_path), summary=str(summary_path))
@@ -0,0 +1,293 @@
+# core/report_store.py
+"""
+SQLite report store.
+
+Every saved report becomes a row in `reports` plus its flake8 issues, radon
+blocks and raw/Halstead metrics in indexed tables, so questions like "which
+files have E501" or "which files have MI below 50" are single queries instead
+of loading every JSON file. Reports are appended, keeping history per file.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+DEFAULT_STORE_PATH = Path(__file__).parent.parent / "reports" / "reports.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    id INTEGER PRIMARY KEY,
+    file TEXT NOT NULL,
+    path TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    mi REAL,
+    mi_rank TEXT,
+    issue_count INTEGER NOT NULL,
+    max_complexity INTEGER,
+    meta TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reports_file ON reports (file, id);
+CREATE INDEX IF NOT EXISTS reports_mi ON reports (mi);
+CREATE TABLE IF NOT EXISTS issues (
+    report_id INTEGER NOT NULL REFERENCES reports (id) ON DELETE CASCADE,
+    line INTEGER,
+    col INTEGER,
+    code TEXT,
+    message TEXT
+);
+CREATE INDEX IF NOT EXISTS issues_report ON issues (report_id);
+CREATE INDEX IF NOT EXISTS issues_code ON issues (code, report_id);
+CREATE TABLE IF NOT EXISTS blocks (
+    report_id INTEGER NOT NULL REFERENCES reports (id) ON DELETE CASCADE,
+    name TEXT,
+    type TEXT,
+    classname TEXT,
+    complexity INTEGER,
+    rank TEXT,
+    lineno INTEGER,
+    endline INTEGER,
+    col_offset INTEGER
+);
+CREATE INDEX IF NOT EXISTS blocks_report ON blocks (report_id);
+CREATE INDEX IF NOT EXISTS blocks_complexity ON blocks (complexity);
+CREATE TABLE IF NOT EXISTS metrics (
+    report_id INTEGER NOT NULL REFERENCES reports (id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value REAL
+);
+CREATE INDEX IF NOT EXISTS metrics_report ON metrics (report_id);
+CREATE INDEX IF NOT EXISTS metrics_name ON metrics (kind, name, value);
+CREATE VIEW IF NOT EXISTS latest_reports AS
+    SELECT * FROM reports WHERE id IN (SELECT MAX(id) FROM reports GROUP BY file);
+"""
+
+_BLOCK_FIELDS = ("name", "type", "classname", "complexity", "rank", "lineno", "endline", "col_offset")
+
+
+def _result_path(report: Dict[str, Any]) -> str:
+    for key in ("radon_mi", "radon_cc", "radon_raw", "radon_halstead"):
+        value = report.get(key)
+        if isinstance(value, dict) and len(value) == 1:
+            return next(iter(value))
+    return report.get("file") or ""
+
+
+def _first_value(value: Any) -> Any:
+    # radon results are {path: result}; reports here hold a single file
+    if isinstance(value, dict) and len(value) == 1:
+        return next(iter(value.values()))
+    return None
+
+
+class ReportStore:
+    """
+    Append-only store of analysis reports with query helpers.
+    """
+
+    def __init__(self, path: str = str(DEFAULT_STORE_PATH)):
+        self.path = str(path)
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA foreign_keys = ON")
+            if self.path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def _insert(self, report: Dict[str, Any]) -> int:
+        path = _result_path(report)
+        issues = [i for i in report.get("flake8_issues") or [] if "code" in i]
+        blocks = _first_value(report.get("radon_cc")) or []
+        if not isinstance(blocks, list):
+            blocks = []
+        mi = _first_value(report.get("radon_mi")) or {}
+        meta = {
+            k: v for k, v in report.items()
+            if k not in ("flake8_issues", "radon_cc", "radon_mi", "radon_raw", "radon_halstead")
+        }
+        cur = self._conn.execute(
+            "INSERT INTO reports (file, path, created_at, mi, mi_rank, issue_count,"
+            " max_complexity, meta) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                report.get("file") or path,
+                path,
+                time.time(),
+                mi.get("mi"),
+                mi.get("rank"),
+                len(issues),
+                max((b.get("complexity", 0) for b in blocks), default=None),
+                json.dumps(meta),
+            ),
+        )
+        report_id = cur.lastrowid
+        self._conn.executemany(
+            "INSERT INTO issues (report_id, line, col, code, message) VALUES (?, ?, ?, ?, ?)",
+            [(report_id, i.get("line"), i.get("col"), i["code"], i.get("message")) for i in issues],
+        )
+        self._conn.executemany(
+            "INSERT INTO blocks (report_id, " + ", ".join(_BLOCK_FIELDS) + ")"
+            " VALUES (?" + ", ?" * len(_BLOCK_FIELDS) + ")",
+            [(report_id, *(b.get(f) for f in _BLOCK_FIELDS)) for b in blocks],
+        )
+        rows = []
+        raw = _first_value(report.get("radon_raw"))
+        if isinstance(raw, dict) and "error" not in raw:
+            rows.extend((report_id, "raw", "", k, v) for k, v in raw.items())
+        halstead = _first_value(report.get("radon_halstead"))
+        if isinstance(halstead, dict) and "total" in halstead:
+            rows.extend((report_id, "halstead", "", k, v) for k, v in halstead["total"].items())
+            for func, values in halstead.get("functions", {}).items():
+                rows.extend((report_id, "halstead", func, k, v) for k, v in values.items())
+        self._conn.executemany(
+            "INSERT INTO metrics (report_id, kind, scope, name, value) VALUES (?, ?, ?, ?, ?)",
+            rows,
+        )
+        return report_id
+
+    def save(self, report: Dict[str, Any]) -> int:
+        """
+        Store one report (the app's final report or an analyze_file report with
+        a "file" key) and return its id.
+        """
+        return self.save_many([report])[0]
+
+    def save_many(self, reports: Iterable[Dict[str, Any]], batch_size: int = 500) -> List[int]:
+        """
+        Store reports in transactions of batch_size reports each.
+        """
+        ids: List[int] = []
+        batch: List[Dict[str, Any]] = []
+        for report in reports:
+            batch.append(report)
+            if len(batch) >= batch_size:
+                ids.extend(self._save_batch(batch))
+                batch = []
+        if batch:
+            ids.extend(self._save_batch(batch))
+        return ids
+
+    def _save_batch(self, reports: List[Dict[str, Any]]) -> List[int]:
+        with self._lock, self._conn:
+            return [self._insert(r) for r in reports]
+
+    def _query(self, sql: str, params: Iterable[Any] = ()) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, tuple(params))]
+
+    def load(self, report_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Rebuild the report JSON (the export/download format) from stored rows.
+        """
+        rows = self._query("SELECT * FROM reports WHERE id = ?", (report_id,))
+        if not rows:
+            return None
+        row = rows[0]
+        path = row["path"]
+        report = json.loads(row["meta"])
+        report["flake8_issues"] = self._query(
+            "SELECT line, col, code, message FROM issues WHERE report_id = ? ORDER BY rowid",
+            (report_id,),
+        )
+        blocks = self._query(
+            "SELECT " + ", ".join(_BLOCK_FIELDS) + " FROM blocks WHERE report_id = ? ORDER BY rowid",
+            (report_id,),
+        )
+        blocks = [{k: v for k, v in b.items() if v is not None} for b in blocks]
+        for block in blocks:
+            if block["type"] == "class":
+                # nested closures are not stored; methods are rebuilt from their own rows
+                block["methods"] = sorted(
+                    (
+                        b for b in blocks
+                        if b["type"] == "method" and b.get("classname") == block["name"]
+                        and block["lineno"] <= b["lineno"] <= block["endline"]
+                    ),
+                    key=lambda b: b["lineno"],
+                )
+        report["radon_cc"] = {path: blocks} if blocks else {}
+        report["radon_mi"] = {path: {"mi": row["mi"], "rank": row["mi_rank"]}} if row["mi"] is not None else {}
+        raw: Dict[str, Any] = {}
+        halstead: Dict[str, Any] = {"total": {}, "functions": {}}
+        for m in self._query(
+            "SELECT kind, scope, name, value FROM metrics WHERE report_id = ? ORDER BY rowid",
+            (report_id,),
+        ):
+            if m["kind"] == "raw":
+                raw[m["name"]] = m["value"]
+            elif m["scope"]:
+                halstead["functions"].setdefault(m["scope"], {})[m["name"]] = m["value"]
+            else:
+                halstead["total"][m["name"]] = m["value"]
+        report["radon_raw"] = {path: raw} if raw else {}
+        report["radon_halstead"] = {path: halstead} if halstead["total"] else {}
+        return report
+
+    def code_counts(self, latest_only: bool = True) -> List[Dict[str, Any]]:
+        """
+        Issues per flake8 code: [{code, issues, files}], most frequent first.
+        """
+        source = "latest_reports" if latest_only else "reports"
+        return self._query(
+            "SELECT i.code AS code, COUNT(*) AS issues, COUNT(DISTINCT r.file) AS files"
+            f" FROM issues i JOIN {source} r ON r.id = i.report_id"
+            " GROUP BY i.code ORDER BY issues DESC"
+        )
+
+    def files_with_code(self, code: str) -> List[Dict[str, Any]]:
+        """
+        Latest reports that contain the given flake8 code: [{file, issues}].
+        """
+        return self._query(
+            "SELECT r.file AS file, COUNT(*) AS issues FROM issues i"
+            " JOIN latest_reports r ON r.id = i.report_id WHERE i.code = ?"
+            " GROUP BY r.file ORDER BY issues DESC",
+            (code,),
+        )
+
+    def files_below_mi(self, threshold: float) -> List[Dict[str, Any]]:
+        return self._query(
+            "SELECT id, file, mi, mi_rank FROM latest_reports WHERE mi < ? ORDER BY mi",
+            (threshold,),
+        )
+
+    def worst_files(self, by: str = "mi", limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Latest reports ranked worst first by "mi", "issues" or "complexity".
+        """
+        order = {
+            "mi": "mi IS NULL, mi ASC",
+            "issues": "issue_count DESC",
+            "complexity": "max_complexity IS NULL, max_complexity DESC",
+        }[by]
+        return self._query(
+            "SELECT id, file, mi, mi_rank, issue_count, max_complexity FROM latest_reports"
+            f" ORDER BY {order} LIMIT ?",
+            (limit,),
+        )
+
+    def history(self, file: str) -> List[Dict[str, Any]]:
+        """
+        Every stored report for file, oldest first.
+        """
+        return self._query(
+            "SELECT id, created_at, mi, mi_rank, issue_count, max_complexity FROM reports"
+            " WHERE file = ? ORDER BY id",
+            (file,),
+        )
+
+
+@lru_cache(maxsize=None)
+def default_store() -> ReportStore:
+    """
+    Process-wide store. AI_CODE_REVIEWER_REPORT_STORE overrides the file location.
+    """
+    return ReportStore(os.environ.get("AI_CODE_REVIEWER_REPORT_STORE", str(DEFAULT_STORE_PATH)))
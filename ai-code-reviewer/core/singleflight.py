@@ -0,0 +1,45 @@
+# core/singleflight.py
+"""
+Single-flight call coalescing.
+
+    flight = SingleFlight()
+    value, shared = flight.do(key, fn, *args)
+
+The first caller for a key runs fn. Callers that arrive with the same key
+while it is still running wait for that call and receive its result (or its
+exception) instead of running fn again; for them shared is True. Nothing is
+remembered once the call finishes, so this complements the result cache: it
+only covers work that is in flight right now.
+
+Every caller receives the same object, so callers must copy it before
+modifying it.
+"""
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Tuple
+
+
+class SingleFlight:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+
+    def do(self, key: str, fn: Callable, *args: Any, **kwargs: Any) -> Tuple[Any, bool]:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            return future.result(), True
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                del self._calls[key]
@@ -1,10 +1,12 @@
 # core/utils.py
 
+import gzip
+
 import json
 
 from pathlib import Path
 
-from typing import Any, Dict
+from typing import IO, Any, Dict, Iterable, Iterator, Optional
 
 
 def read_file(path: str) -> str:
@@ -24,4 +26,113 @@ def save_json(path: str, data: Dict[str, Any]) -> None:
 
 def load_json(path: str) -> Dict[str, Any]:
 
-    return json.loads(Path(path).read_text(encoding="utf-8"))
\ No newline at end of file
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def open_text(path: str, mode: str = "r") -> IO[str]:
+
+    """
+    Open a UTF-8 text file, gzip-compressed when the name ends with .gz.
+    """
+
+    if str(path).endswith(".gz"):
+
+        return gzip.open(path, mode + "t", encoding="utf-8")
+
+    return open(path, mode, encoding="utf-8")
+
+
+class NDJSONWriter:
+
+    """
+    Streaming report sink: one JSON object per line, written as results
+    arrive, so memory use does not grow with the size of the run.
+
+    With per_issue=True each flake8 issue becomes its own
+    {"type": "issue", "file", ...} record, followed by the file's
+    {"type": "file", ...} record without the issue list.
+    """
+
+    def __init__(self, path: Optional[str] = None, stream: Optional[IO[str]] = None, per_issue: bool = False):
+
+        self._owns_stream = stream is None
+
+        self._stream = stream if stream is not None else open_text(path, "w")
+
+        self.per_issue = per_issue
+
+        self.records = 0
+
+    def write(self, record: Dict[str, Any]) -> None:
+
+        self._stream.write(json.dumps(record) + "\n")
+
+        self.records += 1
+
+    def write_report(self, report: Dict[str, Any]) -> None:
+
+        if not self.per_issue:
+
+            self.write(report)
+
+            return
+
+        issues = report.get("flake8_issues") or []
+
+        for issue in issues:
+
+            self.write({"type": "issue", "file": report.get("file"), **issue})
+
+        record = {k: v for k, v in report.items() if k != "flake8_issues"}
+
+        record.update(type="file", issue_count=len(issues))
+
+        self.write(record)
+
+    def flush(self) -> None:
+
+        self._stream.flush()
+
+    def close(self) -> None:
+
+        if self._owns_stream:
+
+            self._stream.close()
+
+        else:
+
+            self._stream.flush()
+
+    def __enter__(self) -> "NDJSONWriter":
+
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+
+        self.close()
+
+
+def save_ndjson(path: str, records: Iterable[Dict[str, Any]]) -> int:
+
+    with NDJSONWriter(path) as writer:
+
+        for record in records:
+
+            writer.write(record)
+
+    return writer.records
+
+
+def iter_ndjson(path: str) -> Iterator[Dict[str, Any]]:
+
+    """
+    Read records one at a time from an NDJSON file (plain or .gz).
+    """
+
+    with open_text(path) as f:
+
+        for line in f:
+
+            if line.strip():
+
+                yield json.loads(line)
\ No newline at end of file
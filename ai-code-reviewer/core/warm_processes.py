@@ -0,0 +1,192 @@
+# core/warm_processes.py
+"""
+Pool of long-lived, pre-warmed worker processes with per-job deadlines.
+
+    pool = WarmProcessPool(4, initializer=load_tools)
+    result = pool.run(fn, *args, timeout=30.0)
+
+Each worker runs initializer once, then serves one job at a time over a pipe.
+Callers wait in the parent for a free worker (that wait does not count
+towards timeout); the deadline starts when the job is handed to a worker. A
+job that overruns it cannot be interrupted, so its worker is killed and a new
+one is started in its place, and the caller gets TimeoutError. A worker that
+dies mid-job is replaced the same way and the caller gets RuntimeError.
+
+Workers are started on demand up to max_workers; start() starts them ahead.
+With a name, the pool keeps the queue_depth, workers, workers_busy,
+worker_busy_seconds_total and worker_timeouts_total metrics for pool=name.
+"""
+import multiprocessing
+import threading
+import time
+from typing import Any, Callable, List, Optional
+
+from core.metrics import QUEUE_DEPTH, WORKER_BUSY_SECONDS, WORKER_TIMEOUTS, WORKERS, WORKERS_BUSY
+
+_READY = "ready"
+
+
+def _worker_main(conn: Any, initializer: Optional[Callable[[], None]]) -> None:
+    if initializer is not None:
+        initializer()
+    conn.send(_READY)
+    while True:
+        try:
+            fn, args = conn.recv()
+        except EOFError:
+            return
+        try:
+            reply = (True, fn(*args))
+        except Exception as e:
+            reply = (False, e)
+        try:
+            conn.send(reply)
+        except Exception as e:
+            # the result or exception did not pickle
+            conn.send((False, RuntimeError(str(e))))
+
+
+class _Worker:
+    def __init__(self, ctx: Any, initializer: Optional[Callable[[], None]]):
+        self.conn, child = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child, initializer), daemon=True)
+        self.process.start()
+        child.close()
+        self.ready = False
+
+    def wait_ready(self) -> None:
+        # the initializer's run time is not part of anyone's deadline
+        if not self.ready:
+            self.conn.recv()
+            self.ready = True
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join(5.0)
+        self.conn.close()
+
+
+class WarmProcessPool:
+    def __init__(
+        self,
+        max_workers: int,
+        initializer: Optional[Callable[[], None]] = None,
+        name: Optional[str] = None,
+    ):
+        self.max_workers = max(max_workers, 1)
+        self.name = name
+        self._initializer = initializer
+        self._ctx = multiprocessing.get_context("spawn")
+        self._cond = threading.Condition()
+        self._idle: List[_Worker] = []
+        self._workers = 0
+        self._waiting = 0
+        self._closed = False
+        if name:
+            WORKERS.set(self.max_workers, pool=name)
+
+    def start(self, workers: Optional[int] = None) -> None:
+        """
+        Start workers now (default: all of them) so they warm up in the background.
+        """
+        wanted = self.max_workers if workers is None else min(workers, self.max_workers)
+        with self._cond:
+            while self._workers < wanted and not self._closed:
+                self._idle.append(self._spawn())
+            self._cond.notify_all()
+            self._record()
+
+    def waiting(self) -> int:
+        with self._cond:
+            return self._waiting
+
+    def busy(self) -> int:
+        with self._cond:
+            return self._workers - len(self._idle)
+
+    def run(self, fn: Callable, *args: Any, timeout: Optional[float] = None) -> Any:
+        worker = self._acquire()
+        started = None
+        try:
+            worker.wait_ready()
+            started = time.perf_counter()
+            worker.conn.send((fn, args))
+            if not worker.conn.poll(timeout):
+                raise TimeoutError(f"timed out after {timeout}s")
+            ok, value = worker.conn.recv()
+        except TimeoutError:
+            # before OSError, which TimeoutError subclasses
+            if self.name:
+                WORKER_TIMEOUTS.inc(pool=self.name)
+            self._replace(worker)
+            raise
+        except (EOFError, OSError) as e:
+            self._replace(worker)
+            raise RuntimeError("worker process exited unexpectedly") from e
+        except BaseException:
+            self._replace(worker)
+            raise
+        finally:
+            if self.name and started is not None:
+                WORKER_BUSY_SECONDS.inc(time.perf_counter() - started, pool=self.name)
+        self._release(worker)
+        if not ok:
+            raise value
+        return value
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._workers -= len(idle)
+            self._cond.notify_all()
+            self._record()
+        for worker in idle:
+            worker.kill()
+
+    def _spawn(self) -> _Worker:
+        # called with the lock held
+        self._workers += 1
+        return _Worker(self._ctx, self._initializer)
+
+    def _record(self) -> None:
+        # called with the lock held
+        if self.name:
+            QUEUE_DEPTH.set(self._waiting, pool=self.name)
+            WORKERS_BUSY.set(self._workers - len(self._idle), pool=self.name)
+
+    def _acquire(self) -> _Worker:
+        with self._cond:
+            self._waiting += 1
+            self._record()
+            try:
+                while not self._idle and self._workers >= self.max_workers:
+                    if self._closed:
+                        raise RuntimeError("pool is closed")
+                    self._cond.wait()
+                return self._idle.pop() if self._idle else self._spawn()
+            finally:
+                self._waiting -= 1
+                self._record()
+
+    def _release(self, worker: _Worker) -> None:
+        with self._cond:
+            closed = self._closed
+            if closed:
+                self._workers -= 1
+            else:
+                self._idle.append(worker)
+                self._cond.notify()
+            self._record()
+        if closed:
+            worker.kill()
+
+    def _replace(self, worker: _Worker) -> None:
+        # the worker may still be busy with the abandoned job; start afresh
+        worker.kill()
+        with self._cond:
+            self._workers -= 1
+            if not self._closed:
+                self._idle.append(self._spawn())
+            self._cond.notify()
+            self._record()
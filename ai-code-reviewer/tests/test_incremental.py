@@ -0,0 +1,97 @@
+import random
+
+import pytest
+
+from core.code_analysis import _flake8_analyzer, _radon_analyzer
+from core.corpus import generate_module
+from core.incremental import analyze_flake8_incremental, analyze_radon_incremental
+
+EDGE_CASES = {
+    "empty": "",
+    "comment only": "# nothing here\n",
+    "two docstrings": '"""doc"""\n"""another"""\nimport os\n',
+    "docstring then import": '"""doc"""\nimport os\n',
+    "byte and raw strings": 'b"x"\nr"y"\nimport os\n',
+    "annotation first": "x: int\n\"\"\"doc\"\"\"\n\nimport os\n",
+    "dunder and if": "__all__ = ['a']\nif True:\n    pass\nimport os\n",
+    "semicolon": "import os; x = 1\nimport sys\n",
+    "continuation line": "import warnings\nwarnings.warn('x',\n              stacklevel=2)\n\nimport os\n",
+    "one-liner defs": "def a(): pass\ndef b(): pass\nx = 1\n",
+    "async one-liner": "async def a(): pass\nx = 1\n",
+    "indented last line": "if x:\n    y = 1\ndef f(): pass\n",
+    "try before def": "try:\n    import json\nexcept ImportError:\n    json = None\ndef f(): pass\n",
+    "two dedents": "class A:\n    def f(self):\n        self.doc = 1\nI = A\n",
+    "string ends unindented": 'def f():\n    x = """\n"""\ndef g(): pass\nI = 1\n',
+    "continued one-liner def": "def f(): return (\n    1)\nl = 2\n",
+}
+
+FUNCTIONS = '''def f(a):
+    return os.path.join(a, helper)
+
+
+class C:
+    def m(self):
+        x: "Thing" = self.__p
+        return cast("Other", x)
+
+    def n(self):
+        global g
+        g = 1
+        return Foo
+
+
+def h():
+    y: Foo = 1
+    return y
+'''
+
+# module headers that change what the functions above see
+HEADERS = [
+    "import os\n",
+    "import os\nhelper = 1\n",
+    "from typing import cast\nfrom os import *\n",
+    "from __future__ import annotations\nFoo = 1\n",
+    "import os\nFoo = 1\ndel Foo\n",
+    "import os\ntry:\n    pass\nexcept E as helper:\n    pass\n",
+    "import os\nhelper: int\n",
+    "import os\nThing = Other = 1\ng = 0\n",
+]
+
+
+def assert_same(source):
+    full = _flake8_analyzer("m.py", source)
+    incremental = analyze_flake8_incremental("m.py", source)
+    assert incremental["flake8_issues"] == full["flake8_issues"]
+    full = _radon_analyzer("m.py", source)
+    incremental = analyze_radon_incremental("m.py", source)
+    for key in ("radon_cc", "radon_mi", "radon_raw", "radon_halstead"):
+        assert incremental[key] == full[key], key
+
+
+@pytest.mark.parametrize("source", EDGE_CASES.values(), ids=EDGE_CASES.keys())
+def test_edge_cases_match_full_run(source):
+    assert_same(source)
+
+
+@pytest.mark.parametrize("after", range(len(HEADERS)))
+@pytest.mark.parametrize("before", range(len(HEADERS)))
+def test_cached_function_bodies_follow_module_names(before, after):
+    # analyze one version first so the second reuses its function bodies
+    analyze_flake8_incremental("m.py", HEADERS[before] + "\n\n" + FUNCTIONS)
+    assert_same(HEADERS[after] + "\n\n" + FUNCTIONS)
+
+
+def test_edits_to_generated_module_match_full_run():
+    rng = random.Random(7)
+    lines = generate_module(random.Random(1), 600, violation_density=0.05).splitlines(True)
+    analyze_flake8_incremental("m.py", "".join(lines))
+    for _ in range(10):
+        i = rng.randrange(len(lines))
+        choice = rng.randrange(3)
+        if choice == 0:
+            lines[i] = lines[i].rstrip("\n") + "  # edited\n"
+        elif choice == 1:
+            lines.insert(i, "import json\n")
+        else:
+            lines.insert(i, "\n")
+        assert_same("".join(lines))